@@ -0,0 +1,127 @@
+import asyncio
+from itertools import islice
+
+from code_size_counter.code_size_counter import CodeSizeCounter
+from code_size_counter.file_tools import FileSetSize
+
+# number of files counted by a single executor task
+DEFAULT_BATCH_SIZE = 256
+
+
+class AsyncCodeSizeCounter:
+    """
+    asyncio counterpart of CodeSizeCounter, the files are counted in an executor so the event loop isn't blocked
+
+    The files are counted in batches, each batch is a separate executor task, so the event loop gets control
+    back after each batch and multiple directories can be counted concurrently.
+    """
+
+    def __init__(
+        self,
+        directory,
+        file_extensions,
+        print_logs,
+        excluded_items,
+        executor=None,
+        limiter=None,
+        batch_size=DEFAULT_BATCH_SIZE,
+        **options,
+    ):
+        """
+        :param directory: the directory where to search files
+        :param file_extensions: extensions of the files that we're searching
+        :param print_logs: should the program print a line about each processed file? (e.g. 'file XXX processed')
+        :param excluded_items: absolute path to directories & files to exclude
+        :param executor: `concurrent.futures.Executor` counting the files (None = default executor of the loop)
+        :param limiter: `asyncio.Semaphore` limiting the number of concurrently running executor tasks,
+            it can be shared by multiple counters (None = no limit)
+        :param batch_size: number of files counted by a single executor task
+        :param options: other options of CodeSizeCounter (e.g. `workers` or `cache_path`)
+        """
+        self._counter = CodeSizeCounter(
+            directory, file_extensions, print_logs, excluded_items, **options
+        )
+        self._executor = executor
+        self._limiter = limiter
+        self._batch_size = batch_size
+
+    async def calculate_size(self):
+        """
+        count lines, size (in bytes) and number of files in the directory with the selected file extension
+
+        :return: dictionary, whose keys are file extensions and values are corresponding FileSetSize objects
+        """
+        sizes_dict = {}
+        async for file_record in self.iter_files():
+            file_set_size = FileSetSize(1, file_record.lines, file_record.size)
+            if file_record.extension in sizes_dict:
+                sizes_dict[file_record.extension].add_in_place(file_set_size)
+            else:
+                sizes_dict[file_record.extension] = file_set_size
+        return sizes_dict
+
+    async def iter_files(self):
+        """
+        count the files in the directory with the selected file extension one by one, as the generator is consumed
+
+        If the consuming task is cancelled, the cancellation takes effect once the batch being counted is finished.
+
+        :return: async generator of FileRecord objects of the counted files
+            (files that can't be decoded are skipped)
+        """
+        loop = asyncio.get_running_loop()
+        file_records = self._counter.iter_files()
+        try:
+            while True:
+                batch = await self._run_in_executor(
+                    loop, _get_next_batch, file_records, self._batch_size
+                )
+                if not batch:
+                    break
+
+                for file_record in batch:
+                    yield file_record
+        finally:
+            await self._run_in_executor(loop, file_records.close)
+
+    async def _run_in_executor(self, loop, function, *args):
+        """
+        run the function in the executor, respecting the limit of the concurrently running tasks
+
+        If the calling task is cancelled, the cancellation is propagated once the function finishes,
+        because the function can't be interrupted in the executor (and e.g. the generator of the files
+        can't be closed while it's still executing).
+        """
+        if self._limiter is None:
+            return await _wait_for_function(
+                loop.run_in_executor(self._executor, function, *args)
+            )
+
+        async with self._limiter:
+            return await _wait_for_function(
+                loop.run_in_executor(self._executor, function, *args)
+            )
+
+
+async def _wait_for_function(future):
+    """
+    wait for the result of the function running in the executor, without cancelling it
+
+    :param future: asyncio future of the function
+    """
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        await asyncio.wait([future])
+        raise
+
+
+def _get_next_batch(file_records, batch_size):
+    """
+    get the next files from the generator
+
+    :param file_records: generator of FileRecord objects
+    :param batch_size: maximum number of the files to get
+    :return: list of FileRecord objects, it's empty if there are no more files
+    """
+    return list(islice(file_records, batch_size))
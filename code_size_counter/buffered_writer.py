@@ -0,0 +1,40 @@
+# default number of characters collected before they're written to the stream
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class BufferedTextWriter:
+    """
+    class collecting text in a buffer and writing it to the stream in large blocks
+
+    Each block is flushed right after it's written, so the output can be consumed while the program is running,
+    but the stream isn't flushed after every line (which is slow especially on terminals).
+    """
+
+    def __init__(self, stream, buffer_size=DEFAULT_BUFFER_SIZE):
+        """
+        :param stream: text stream to write to
+        :param buffer_size: number of characters collected before they're written to the stream
+        """
+        self._stream = stream
+        self._buffer_size = buffer_size
+        self._buffer = []
+        self._buffered_size = 0
+
+    def write(self, text):
+        """
+        add the text to the buffer, the buffer is written to the stream if it's full
+        """
+        self._buffer.append(text)
+        self._buffered_size += len(text)
+        if self._buffered_size >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        write the buffered text to the stream and flush it
+        """
+        if self._buffer:
+            self._stream.write("".join(self._buffer))
+            self._buffer.clear()
+            self._buffered_size = 0
+        self._stream.flush()
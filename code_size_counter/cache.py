@@ -0,0 +1,264 @@
+import json
+import os
+import threading
+
+from code_size_counter.file_tools import FileSetSize
+
+CACHE_FILE_NAME = "lines-count.sqlite3"
+
+# returned by `LinesCountCache.get` if the file isn't in the cache (or it was modified since it was cached)
+CACHE_MISS = object()
+
+# maximum number of results stored in the cache before they're committed
+COMMIT_INTERVAL = 1000
+
+
+class LinesCountCache:
+    """
+    persistent cache of the file sizes, stored in a SQLite database
+
+    The results are keyed by the absolute path to the file and validated by its inode number,
+    modification time and size, so modified files are counted again.
+
+    Besides the results of single files, the cache stores aggregated results of the files directly in a directory,
+    validated by a fingerprint of the files.
+
+    The cache can be shared by threads and it can be sent to worker processes,
+    each process opens its own connection to the database.
+    """
+
+    def __init__(self, cache_path):
+        """
+        :param cache_path: path to the database file, it's created if it doesn't exist
+        """
+        self.cache_path = cache_path
+        self._connection = None
+        self._lock = threading.Lock()
+        self._uncommitted_count = 0
+
+    def get(self, file_manager):
+        """
+        get the cached size of the file
+
+        :param file_manager: FileManager of the file
+        :return: FileSetSize of the file, None if the file can't be decoded or `CACHE_MISS`
+        """
+        with self._lock:
+            row = (
+                self._get_connection()
+                .execute(
+                    "SELECT inode, mtime_ns, size, binary_mode, lines FROM files WHERE path = ?",
+                    (os.path.abspath(file_manager.file_path),),
+                )
+                .fetchone()
+            )
+
+        if row is None or row[:4] != _get_file_key(file_manager):
+            return CACHE_MISS
+
+        lines_count = row[4]
+        return None if lines_count is None else FileSetSize(1, lines_count, row[2])
+
+    def set(self, file_manager, file_size):
+        """
+        store the size of the file
+
+        :param file_manager: FileManager of the file
+        :param file_size: FileSetSize of the file, None if the file can't be decoded
+        """
+        lines_count = None if file_size is None else file_size.total_lines
+        self._write(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+            (os.path.abspath(file_manager.file_path),)
+            + _get_file_key(file_manager)
+            + (lines_count,),
+        )
+
+    def set_many(self, file_results):
+        """
+        store the sizes of multiple files and commit them at once
+
+        The files are written in a single short transaction, so that other processes sharing the database
+        aren't blocked by a write transaction left open while the files are being read.
+
+        :param file_results: list of (FileManager, FileSetSize or None if the file can't be decoded) tuples
+        """
+        if not file_results:
+            return
+
+        rows = [
+            (os.path.abspath(file_manager.file_path),)
+            + _get_file_key(file_manager)
+            + (None if file_size is None else file_size.total_lines,)
+            for file_manager, file_size in file_results
+        ]
+        with self._lock:
+            connection = self._get_connection()
+            connection.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            connection.commit()
+            self._uncommitted_count = 0
+
+    def get_directory(self, directory, file_managers):
+        """
+        get the cached sizes of the files in the directory
+
+        :param directory: path to the directory
+        :param file_managers: FileManager objects of all files in the directory that should be counted
+        :return: dictionary of FileSetSize objects by file extension or `CACHE_MISS`
+            if the files were modified since they were cached
+        """
+        with self._lock:
+            row = (
+                self._get_connection()
+                .execute(
+                    "SELECT fingerprint, sizes FROM directories WHERE path = ?",
+                    (os.path.abspath(directory),),
+                )
+                .fetchone()
+            )
+
+        if row is None or row[0] != get_directory_fingerprint(file_managers):
+            return CACHE_MISS
+
+        return {ext: FileSetSize(*sizes) for ext, sizes in json.loads(row[1]).items()}
+
+    def set_directory(self, directory, file_managers, sizes_dict):
+        """
+        store the sizes of the files in the directory and commit it right away
+
+        The write isn't left in an open transaction, because worker processes may store the results of the files
+        in the same database meanwhile (and the directories are stored while waiting for their results).
+
+        :param directory: path to the directory
+        :param file_managers: FileManager objects of all files in the directory that should be counted
+        :param sizes_dict: dictionary of FileSetSize objects (of these files) by file extension
+        """
+        sizes = {
+            ext: (size.total_files, size.total_lines, size.total_size)
+            for ext, size in sizes_dict.items()
+        }
+        self._write(
+            "INSERT OR REPLACE INTO directories VALUES (?, ?, ?)",
+            (
+                os.path.abspath(directory),
+                get_directory_fingerprint(file_managers),
+                json.dumps(sizes),
+            ),
+        )
+        self.commit()
+
+    def commit(self):
+        """
+        commit the stored results to the database
+        """
+        with self._lock:
+            if self._connection is not None:
+                self._connection.commit()
+                self._uncommitted_count = 0
+
+    def close(self):
+        """
+        commit the stored results and close the connection to the database
+        """
+        self.commit()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _write(self, sql, parameters):
+        """
+        execute the SQL statement that modifies the database, it's committed later in a batch
+        """
+        with self._lock:
+            self._get_connection().execute(sql, parameters)
+            self._uncommitted_count += 1
+            if self._uncommitted_count >= COMMIT_INTERVAL:
+                self._connection.commit()
+                self._uncommitted_count = 0
+
+    def _get_connection(self):
+        """
+        get connection to the database, open it (and create the database) if it isn't open yet
+        """
+        if self._connection is None:
+            # imported here, so that the startup isn't slowed down if the cache isn't used
+            import sqlite3
+
+            cache_dir = os.path.dirname(self.cache_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+
+            self._connection = sqlite3.connect(
+                self.cache_path, timeout=60, check_same_thread=False
+            )
+            self._connection.execute("PRAGMA journal_mode = WAL")
+            self._connection.execute("PRAGMA synchronous = NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS files ("
+                "path TEXT PRIMARY KEY, inode INTEGER, mtime_ns INTEGER, size INTEGER, "
+                "binary_mode INTEGER, lines INTEGER)"
+            )
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS directories ("
+                "path TEXT PRIMARY KEY, fingerprint TEXT, sizes TEXT)"
+            )
+        return self._connection
+
+    def __getstate__(self):
+        # the connection and the lock can't be sent to other processes
+        return {"cache_path": self.cache_path}
+
+    def __setstate__(self, state):
+        self.__init__(state["cache_path"])
+
+
+def get_default_cache_path():
+    """
+    get path to the default cache file (in the user's cache directory, e.g. ~/.cache/code-size-counter)
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "code-size-counter", CACHE_FILE_NAME)
+
+
+def get_directory_fingerprint(file_managers):
+    """
+    get fingerprint of the files in a directory, it changes whenever any of the files is added, removed or modified
+
+    The extension of each file (as matched by the counter) is a part of the fingerprint as well, because it depends
+    on the searched extensions (e.g. 'x.d.ts' is reported as 'd.ts' or 'ts') and on matching them case-insensitively.
+
+    :param file_managers: FileManager objects of the files
+    """
+    import hashlib
+
+    fingerprint = hashlib.blake2b(digest_size=16)
+    for file_manager in sorted(file_managers, key=lambda fm: fm.file_path):
+        name = os.path.basename(file_manager.file_path)
+        extension = file_manager.get_extension()
+        file_key = " ".join(map(str, _get_file_key(file_manager)))
+        fingerprint.update(
+            f"{name}\0{extension}\0{file_key}\0".encode(errors="surrogateescape")
+        )
+    return fingerprint.hexdigest()
+
+
+def _get_file_key(file_manager):
+    """
+    get values that identify the current version of the file
+
+    The line counting mode is a part of the key, because counting lines in binary mode may give different results.
+
+    :return: tuple (inode, modification time in ns, size, is binary line counting mode used)
+    """
+    stat_result = file_manager.get_stat()
+    return (
+        stat_result.st_ino,
+        stat_result.st_mtime_ns,
+        stat_result.st_size,
+        int(file_manager.counts_lines_in_binary_mode()),
+    )
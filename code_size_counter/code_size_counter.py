@@ -1,10 +1,39 @@
 import os
+import stat
+from collections import deque
+from functools import partial
+from itertools import groupby, islice
 
+from code_size_counter.cache import CACHE_MISS, LinesCountCache
 from code_size_counter.file_tools import (
-    FileSetSize,
     FileManager,
+    FileRecord,
+    FileSetSize,
     get_path_with_slashes,
+    list_git_files,
 )
+from code_size_counter.extension_matcher import ExtensionMatcher
+from code_size_counter.ignore_patterns import IgnorePatternMatcher
+from code_size_counter.progress import FileLog
+
+# number of files counted by a worker process in a single task
+BATCH_SIZE = 256
+
+# maximum number of tasks waiting in the queue (per worker process/thread)
+QUEUE_SIZE_PER_WORKER = 4
+
+# sources of the list of files
+FILESYSTEM_SOURCE = "filesystem"
+GIT_SOURCE = "git"
+
+GITIGNORE_FILE = ".gitignore"
+GIT_DIRECTORY = ".git"
+
+# metrics that can be computed (number of files, lines and size in bytes)
+FILES_METRIC = "files"
+LINES_METRIC = "lines"
+SIZE_METRIC = "size"
+ALL_METRICS = (FILES_METRIC, LINES_METRIC, SIZE_METRIC)
 
 
 class CodeSizeCounter:
@@ -12,21 +41,78 @@ class CodeSizeCounter:
     class responsible for computing the source code size in the given directory
     """
 
-    def __init__(self, directory, file_extensions, print_logs, excluded_items):
+    def __init__(
+        self,
+        directory,
+        file_extensions,
+        print_logs,
+        excluded_items,
+        workers=1,
+        io_threads=0,
+        fast_line_count=False,
+        mmap_threshold=None,
+        excluded_patterns=(),
+        respect_gitignore=False,
+        source=FILESYSTEM_SOURCE,
+        cache_path=None,
+        listeners=(),
+        metrics=ALL_METRICS,
+        ignore_extension_case=False,
+    ):
         """
         :param directory: the directory where to search files
         :param file_extensions: extensions of the files that we're searching
-        :param print_logs: should the program print its progress? (e.g. 'file XXX processed')
+        :param print_logs: should the program print a line about each processed file? (e.g. 'file XXX processed'),
+            the lines are written through a large buffer (not used in the watch mode)
         :param excluded_items: absolute path to directories & files to exclude
+        :param workers: number of worker processes used for counting the files (1 = count in this process)
+        :param io_threads: number of threads reading the files while the directory tree is walked
+            (0 = read the files in the walking thread); can't be combined with `workers`
+        :param fast_line_count: count lines in binary mode, without decoding the files
+            (binary files are skipped, but other files that can't be decoded aren't skipped in this mode)
+        :param mmap_threshold: minimal size (in bytes) of the files whose lines are counted in a memory-mapped file
+            (None = never map the files); such files are counted in binary mode
+        :param excluded_patterns: patterns (in gitignore syntax) of directories & files to exclude,
+            relative to the given directory
+        :param respect_gitignore: skip directories & files ignored by `.gitignore` files in the searched directory
+            (and the `.git` directory itself)
+        :param source: where to get the list of files from - either walk the directory tree (`FILESYSTEM_SOURCE`)
+            or take the files tracked by git (`GIT_SOURCE`), in which case `respect_gitignore` has no effect
+        :param cache_path: path to the cache of the counted files, unmodified files are taken from the cache
+            instead of being read (None = don't use cache)
+        :param listeners: FileListener objects notified about each processed file (not used in the watch mode)
+        :param metrics: metrics to compute (`FILES_METRIC`, `LINES_METRIC` or `SIZE_METRIC`), the metrics
+            that aren't computed are reported as 0; if lines aren't counted, the files aren't opened at all
+            (so files that can't be decoded aren't skipped) and if neither lines nor size are computed,
+            not even their metadata is read
+        :param ignore_extension_case: match the file extensions case-insensitively
         """
+        if workers > 1 and io_threads > 0:
+            raise ValueError("Worker processes and I/O threads can't be combined")
+
         self._directory = directory
-        self._file_extensions = file_extensions
-        self._include_all_files = file_extensions == ()
-        self._print_logs = print_logs
+        self._extension_matcher = ExtensionMatcher(
+            file_extensions, ignore_extension_case
+        )
         self._excluded_items = excluded_items
+        self._workers = workers
+        self._io_threads = io_threads
+        self._fast_line_count = fast_line_count
+        self._mmap_threshold = mmap_threshold
+        self._pattern_matcher = IgnorePatternMatcher(excluded_patterns)
+        self._respect_gitignore = respect_gitignore
+        self._source = source
+        self._cache = None if cache_path is None else LinesCountCache(cache_path)
+        self._listeners = (FileLog(),) + tuple(listeners) if print_logs else listeners
+        self._count_lines = LINES_METRIC in metrics
+        self._count_size = SIZE_METRIC in metrics
         self._sizes_dict = {}
 
         self._check_if_paths_exist()
+        # identifiers of the excluded items, so that each visited path is checked by a single lookup
+        self._excluded_ids = {
+            _get_file_id(ex, os.stat(ex)) for ex in self._excluded_items
+        }
 
     def calculate_size(self):
         """
@@ -34,75 +120,567 @@ class CodeSizeCounter:
 
         :return: dictionary, whose keys are file extensions and values are corresponding FileSetSize objects
         """
-        self._calculate_size(self._directory)
+        if self._uses_directory_cache():
+            self._calculate_size_with_directory_cache()
+        else:
+            # the FileSetSize of each file is added to the totals directly, no FileRecord is created
+            # unless there are listeners
+            for file_manager, file_size, _ in self._iter_counted_files(False):
+                self._add_file_size(file_size, file_manager.get_extension())
+
         return self._sizes_dict
 
-    def _calculate_size(self, directory):
+    def iter_files(self):
         """
-        count lines, size (in bytes) and number of files in the directory with the selected file extension
+        count the files in the directory with the selected file extension one by one, as the generator is consumed
 
-        :param directory: directory where to search files
+        Only a bounded number of files is counted ahead (by worker processes or I/O threads), so the files are
+        counted just as fast as they're consumed. Closing the generator stops the counting.
+
+        :return: generator of FileRecord objects of the counted files (files that can't be decoded are skipped)
+        """
+        results = self._iter_counted_files(True)
+        try:
+            for _, _, file_record in results:
+                yield file_record
+        finally:
+            results.close()
+
+    def _iter_counted_files(self, create_records):
+        """
+        count the files in the directory with the selected file extension and notify the listeners about them
+
+        :param create_records: create FileRecord objects of the files even if there are no listeners
+        :return: generator of (FileManager, FileSetSize, FileRecord or None) tuples of the counted files
+            (files that can't be decoded are skipped)
+        """
+        create_records = create_records or bool(self._listeners)
+        results = self._count_files(self._find_files(self._directory))
+        try:
+            for file_manager, file_size in results:
+                if file_size is None:
+                    for listener in self._listeners:
+                        listener.file_skipped(file_manager.file_path)
+                    continue
+
+                file_record = None
+                if create_records:
+                    file_record = FileRecord(
+                        file_manager.file_path,
+                        file_manager.get_extension(),
+                        file_size.total_lines,
+                        file_size.total_size,
+                    )
+                    for listener in self._listeners:
+                        listener.file_counted(file_record)
+                yield file_manager, file_size, file_record
+
+            for listener in self._listeners:
+                listener.finished()
+        finally:
+            results.close()
+            if self._cache is not None:
+                self._cache.close()
+
+    def _calculate_size_with_directory_cache(self):
+        """
+        count the files and add them to `_sizes_dict`, taking the results of unchanged directories from the cache
+        """
+        files = self._find_files(self._directory)
+        results = self._cache_directories(
+            self._count_files(self._skip_unchanged_directories(files))
+        )
+        try:
+            for file_manager, file_size in results:
+                if file_size is not None:
+                    self._add_file_size(file_size, file_manager.get_extension())
+        finally:
+            results.close()
+            self._cache.close()
+
+    def watch(self, on_update, poll_interval=None):
+        """
+        count lines, size (in bytes) and number of files in the directory and keep on updating the results
+        whenever the files change, this method runs until it's interrupted (e.g. by KeyboardInterrupt)
+
+        Changes are detected by inotify (on Linux) or by periodical scans of the files' metadata. In both cases,
+        only the files that were added or modified are read again.
+
+        :param on_update: function called with the dictionary of FileSetSize objects by file extension
+            (see `calculate_size`) after the initial count and after each change of the results
+        :param poll_interval: interval (in seconds) between two scans, if inotify isn't available
+            (None = `DEFAULT_POLL_INTERVAL` of the watch module)
+        """
+        # the watchers (using ctypes) are imported just in the watch mode, so that the startup stays fast
+        from code_size_counter.watch import DEFAULT_POLL_INTERVAL, create_watcher
+
+        if poll_interval is None:
+            poll_interval = DEFAULT_POLL_INTERVAL
+
+        # (stat key, extension, FileSetSize or None) tuples of the counted files by their paths
+        file_results = {}
+        try:
+            with create_watcher(poll_interval) as watcher:
+                self._rescan_files(file_results, watcher)
+                on_update(self._sizes_dict)
+
+                while True:
+                    changes = watcher.wait_for_changes()
+                    if changes.structure_changed:
+                        updated = self._rescan_files(file_results, watcher)
+                    else:
+                        updated = self._recount_modified_files(
+                            file_results, changes.modified_files
+                        )
+
+                    if updated:
+                        on_update(self._sizes_dict)
+        finally:
+            if self._cache is not None:
+                self._cache.close()
+
+    def _rescan_files(self, file_results, watcher):
+        """
+        scan the directory again, count just the added or modified files and update the results
+
+        :param file_results: results of the counted files by their paths (see `watch`), it's updated in place
+        :param watcher: watcher of the directories, all searched directories are added to it
+        :return: were the results updated?
+        """
+        visited_directories = set()
+        old_results = dict(file_results)
+        modified_files = []
+        for file_manager in self._find_files(self._directory, visited_directories):
+            try:
+                stat_key = _get_stat_key(file_manager.get_stat())
+            except (FileNotFoundError, NotADirectoryError):
+                # removed after it was listed, its old result (if any) is removed below
+                continue
+
+            old_result = old_results.pop(file_manager.file_path, None)
+            if old_result is None or old_result[0] != stat_key:
+                modified_files.append(file_manager)
+
+        for directory in visited_directories:
+            watcher.add_directory(directory)
+
+        # remove deleted (or newly excluded) files
+        for file_path in old_results:
+            self._update_file_result(file_results, file_path, None)
+
+        for file_manager, file_size in self._count_files(modified_files):
+            self._update_file_result(
+                file_results, file_manager.file_path, file_manager, file_size
+            )
+
+        return bool(old_results or modified_files)
+
+    def _recount_modified_files(self, file_results, modified_files):
+        """
+        count the modified files again and update the results, files that weren't counted before are ignored
+
+        :param file_results: results of the counted files by their paths (see `watch`), it's updated in place
+        :param modified_files: paths to the modified files
+        :return: were the results updated?
+        """
+        file_managers = [
+            self._create_file_manager(file_path, file_results[file_path][1])
+            for file_path in modified_files
+            if file_path in file_results
+        ]
+        for file_manager in file_managers:
+            if self._count_lines:
+                file_size = _count_file(file_manager, self._cache)
+            else:
+                file_size = self._count_file_without_reading(file_manager)
+            self._update_file_result(
+                file_results, file_manager.file_path, file_manager, file_size
+            )
+        return bool(file_managers)
+
+    def _update_file_result(
+        self, file_results, file_path, file_manager, file_size=None
+    ):
+        """
+        replace the result of the file, both in `file_results` and in `_sizes_dict`
+
+        :param file_results: results of the counted files by their paths (see `watch`)
+        :param file_path: path to the file
+        :param file_manager: FileManager of the file or None if the file is no longer counted
+            (the file is no longer counted as well, if it was removed in the meantime)
+        :param file_size: FileSetSize of the file or None if the file can't be decoded
+        """
+        old_result = file_results.pop(file_path, None)
+        if old_result is not None and old_result[2] is not None:
+            self._subtract_file_size(old_result[2], old_result[1])
+
+        if file_manager is not None:
+            try:
+                stat_key = _get_stat_key(file_manager.get_stat())
+            except (FileNotFoundError, NotADirectoryError):
+                return
+
+            ext = file_manager.get_extension()
+            file_results[file_path] = (stat_key, ext, file_size)
+            if file_size is not None:
+                self._add_file_size(file_size, ext)
+
+    def _uses_directory_cache(self):
+        """
+        check if aggregated results of whole directories are taken from the cache
+
+        This requires files of each directory to be listed together (which is true when walking the directory tree)
+        and it's possible only if the results of single files aren't needed (e.g. for logs or listeners).
+        """
+        return (
+            self._cache is not None
+            and self._source == FILESYSTEM_SOURCE
+            and self._count_lines
+            and not self._listeners
+        )
+
+    def _skip_unchanged_directories(self, file_managers):
+        """
+        add the cached results of directories whose files weren't modified and skip their files
+
+        Note that only the files directly in the directory are skipped, because a modification of a file
+        in a subdirectory doesn't change the modification time of the parent directories.
+
+        :param file_managers: iterable of FileManager objects, files of each directory must be listed together
+        :return: generator of FileManager objects of the files in the directories that aren't cached
         """
+        for directory, group in groupby(
+            file_managers, key=lambda fm: os.path.dirname(fm.file_path)
+        ):
+            group = list(group)
+            cached_sizes = self._cache.get_directory(directory, group)
+            if cached_sizes is CACHE_MISS:
+                yield from group
+                continue
+
+            for ext, file_set_size in cached_sizes.items():
+                self._add_file_size(file_set_size, ext)
+
+    def _cache_directories(self, results):
+        """
+        store aggregated results of the directories in the cache
+
+        :param results: iterable of (FileManager, FileSetSize or None) tuples, files of each directory must be
+            listed together
+        :return: generator of the same results (each directory is yielded once all its files are counted)
+        """
+        for directory, group in groupby(
+            results, key=lambda result: os.path.dirname(result[0].file_path)
+        ):
+            group = list(group)
+            sizes_dict = {}
+            for file_manager, file_size in group:
+                if file_size is not None:
+                    _add_to_sizes_dict(
+                        sizes_dict, file_size, file_manager.get_extension()
+                    )
+
+            self._cache.set_directory(
+                directory, [file_manager for file_manager, _ in group], sizes_dict
+            )
+            yield from group
 
+    def _count_files(self, file_managers):
+        """
+        count the files, either in this thread, in worker processes or in I/O threads
+
+        :param file_managers: iterable of FileManager objects of the files to count
+        :return: generator of (FileManager, FileSetSize or None if the file can't be decoded) tuples,
+            in the order of the files
+        """
+        if not self._count_lines:
+            for file_manager in file_managers:
+                yield file_manager, self._count_file_without_reading(file_manager)
+        elif self._workers > 1:
+            yield from self._count_files_parallel(file_managers)
+        elif self._io_threads > 0:
+            yield from self._count_files_threaded(file_managers)
+        else:
+            for file_manager in file_managers:
+                yield file_manager, _count_file(file_manager, self._cache)
+
+    def _count_file_without_reading(self, file_manager):
+        """
+        count the file without opening it (used if lines aren't counted)
+
+        :return: FileSetSize of the file with 0 lines, or None if the file was removed after it was listed
+        """
+        try:
+            size = file_manager.get_size() if self._count_size else 0
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return FileSetSize(1, 0, size)
+
+    def _count_files_parallel(self, file_managers):
+        """
+        count the files in worker processes, the files are split into batches
+
+        :param file_managers: iterable of FileManager objects of the files to count
+        :return: generator of (FileManager, FileSetSize or None) tuples, in the order of the files
+        """
+        # the executors are imported just when they're used, so that the startup stays fast
+        from concurrent.futures import ProcessPoolExecutor
+
+        file_managers = iter(file_managers)
+        batches = iter(lambda: list(islice(file_managers, BATCH_SIZE)), [])
+
+        with ProcessPoolExecutor(max_workers=self._workers) as executor:
+            results = _map_with_bounded_queue(
+                executor,
+                partial(_count_batch, cache=self._cache),
+                batches,
+                QUEUE_SIZE_PER_WORKER * self._workers,
+            )
+            for batch, file_sizes in results:
+                yield from zip(batch, file_sizes)
+
+    def _count_files_threaded(self, file_managers):
+        """
+        count the files in a pool of threads, while this thread keeps on walking the directory tree
+
+        This is useful on network filesystems, where the time is spent waiting for I/O rather than on the CPU.
+
+        :param file_managers: iterable of FileManager objects of the files to count
+        :return: generator of (FileManager, FileSetSize or None) tuples, in the order of the files
+        """
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=self._io_threads) as executor:
+            yield from _map_with_bounded_queue(
+                executor,
+                partial(_count_file, cache=self._cache),
+                file_managers,
+                QUEUE_SIZE_PER_WORKER * self._io_threads,
+            )
+
+    def _find_files(self, directory, visited_directories=None):
+        """
+        yield FileManager objects of the files that should be counted
+
+        :param directory: directory where to search files
+        :param visited_directories: if set, paths to all searched directories are added to it
+        """
         # if it's in excluded files/directories, return
         if self._is_excluded(directory):
             return
 
-        items = os.listdir(directory)
-        files = [f for f in items if os.path.isfile(os.path.join(directory, f))]
-        directories = [d for d in items if os.path.isdir(os.path.join(directory, d))]
+        if self._source == GIT_SOURCE:
+            yield from self._find_git_files(directory, visited_directories)
+        else:
+            yield from self._walk_directory(directory, visited_directories)
 
-        for sub_dir in directories:  # add the size of all subdirs
-            directory_path = os.path.join(directory, sub_dir)
-            self._calculate_size(directory_path)
+    def _walk_directory(self, directory, visited_directories=None):
+        """
+        walk the directory tree and yield FileManager objects of the files that should be counted
 
-        for file in files:  # add the size of all files
-            file_path = os.path.join(directory, file)
-            file_manager = FileManager(file_path)
-            if (
-                not self._include_all_files
-                and not file_manager.has_one_of_extensions(self._file_extensions)
-            ) or self._is_excluded(file_path):
-                continue
+        The tree is walked iteratively (using an explicit stack) with `os.scandir`, so that the type
+        information cached in `os.DirEntry` objects is reused and deep trees don't hit the recursion limit.
+
+        :param directory: directory where to search files
+        :param visited_directories: if set, paths to all visited directories are added to it
+        """
+        # with I/O threads, the files are stat-ed by the thread that counts them (FileManager.get_stat),
+        # so that the latency of the stat calls (e.g. on network filesystems) overlaps as well
+        stat_in_walk = (self._count_lines and self._io_threads == 0) or (
+            self._count_size and not self._count_lines
+        )
+        # (path, path relative to the searched directory, matchers of the applicable .gitignore files) tuples
+        stack = [(directory, "", ())]
+        while stack:
+            current_dir, current_relative_dir, gitignore_matchers = stack.pop()
+            if visited_directories is not None:
+                visited_directories.add(current_dir)
+            sub_dirs = []
+            files = []
 
             try:
-                file_size = FileSetSize(
-                    1, file_manager.get_lines_count(), file_manager.get_size()
+                with os.scandir(current_dir) as entries_iterator:
+                    entries = list(entries_iterator)
+            except (FileNotFoundError, NotADirectoryError):
+                # removed after its parent was listed
+                continue
+
+            if self._respect_gitignore:
+                gitignore_matchers = self._read_gitignore(
+                    entries, current_relative_dir, gitignore_matchers
                 )
 
-                ext = file_manager.get_extension()
+            for entry in entries:
+                relative_path = current_relative_dir + entry.name
+                if entry.is_dir():
+                    if not self._is_entry_excluded(
+                        entry, relative_path, True, gitignore_matchers
+                    ):
+                        sub_dirs.append(
+                            (entry.path, relative_path + "/", gitignore_matchers)
+                        )
+                elif entry.is_file():
+                    extension = self._extension_matcher.match(entry.name)
+                    if extension is None or self._is_entry_excluded(
+                        entry, relative_path, False, gitignore_matchers
+                    ):
+                        continue
 
-                # Add to sizes_dict
-                self._add_file_size(file_size, ext)
+                    file_manager = self._create_file_manager(entry.path, extension)
+                    if stat_in_walk:
+                        try:
+                            file_manager.stat_result = entry.stat()
+                        except (
+                            FileNotFoundError
+                        ):  # removed after the directory was listed
+                            continue
+                    files.append(file_manager)
 
-                if self._print_logs:
-                    print(f"{get_path_with_slashes(file_path)} processed")
-            except (
-                UnicodeDecodeError
-            ):  # Ignore binary files and other ones that can't be decoded
-                if self._print_logs:
-                    print(
-                        f"Skipping {get_path_with_slashes(file_path)} , which can't be opened in read mode"
-                    )
+            # reversed, so that the subdirectories are visited in the order they were listed
+            stack.extend(reversed(sub_dirs))
+            yield from files
+
+    def _find_git_files(self, directory, visited_directories=None):
+        """
+        yield FileManager objects of the files tracked by git that should be counted
+
+        The list of files is read from the git index, so untracked files are never visited.
+
+        :param directory: directory where to search files
+        :param visited_directories: if set, paths to the directories of the counted files are added to it
+        """
+        # cached results of the exclusion checks of directories (by their path relative to the searched directory)
+        excluded_dirs = {"": False}
+
+        for relative_path in list_git_files(directory):
+            extension = self._extension_matcher.match(relative_path.rpartition("/")[2])
+            if extension is None:
+                continue
+
+            relative_dir = relative_path.rpartition("/")[0]
+            if self._is_git_directory_excluded(directory, relative_dir, excluded_dirs):
+                continue
+
+            file_path = os.path.join(directory, relative_path)
+            try:
+                stat_result = os.stat(file_path)
+            except FileNotFoundError:  # deleted from the working tree
+                continue
+
+            if (
+                not stat.S_ISREG(stat_result.st_mode)
+                or self._pattern_matcher.is_ignored(relative_path, False)
+                or _get_file_id(file_path, stat_result) in self._excluded_ids
+            ):
+                continue
+
+            file_manager = self._create_file_manager(file_path, extension)
+            file_manager.stat_result = stat_result
+            if visited_directories is not None:
+                visited_directories.add(os.path.dirname(file_path))
+            yield file_manager
+
+    def _is_git_directory_excluded(self, directory, relative_dir, excluded_dirs):
+        """
+        check if the directory (or any of its parents) is excluded from the code size calculation
+
+        :param directory: the searched directory
+        :param relative_dir: path of the directory relative to the searched directory, using forward slashes
+        :param excluded_dirs: cached results of this method, by the relative path of the directory
+        """
+        if relative_dir not in excluded_dirs:
+            parent_dir = relative_dir.rpartition("/")[0]
+            excluded_dirs[relative_dir] = (
+                self._is_git_directory_excluded(directory, parent_dir, excluded_dirs)
+                or self._pattern_matcher.is_ignored(relative_dir, True)
+                or self._is_excluded(os.path.join(directory, relative_dir))
+            )
+        return excluded_dirs[relative_dir]
+
+    def _create_file_manager(self, file_path, extension):
+        """
+        create FileManager of the file, configured for counting
+
+        :param file_path: path to the file
+        :param extension: extension of the file (as matched by the extension matcher)
+        """
+        return FileManager(
+            file_path,
+            fast_line_count=self._fast_line_count,
+            mmap_threshold=self._mmap_threshold,
+            extension=extension,
+        )
+
+    def _read_gitignore(self, entries, relative_dir, gitignore_matchers):
+        """
+        read the `.gitignore` file in the directory (if there's any)
+
+        :param entries: `os.DirEntry` objects of the directory content
+        :param relative_dir: path of the directory relative to the searched directory (ending with a slash)
+        :param gitignore_matchers: (relative directory, IgnorePatternMatcher) tuples of the `.gitignore` files
+            in the parent directories
+        :return: `gitignore_matchers` extended by the matcher of the `.gitignore` file in this directory
+        """
+        for entry in entries:
+            if entry.name == GITIGNORE_FILE and entry.is_file():
+                with open(entry.path, "r", errors="replace") as file:
+                    matcher = IgnorePatternMatcher(file.readlines())
+                if matcher:
+                    return gitignore_matchers + ((relative_dir, matcher),)
+        return gitignore_matchers
 
     def _add_file_size(self, file_set_size, file_extension):
         """
         Add file set size to `_sizes_dict` dictionary
         """
-        new_size = (
-            self._sizes_dict[file_extension] + file_set_size
-            if file_extension in self._sizes_dict
-            else file_set_size
-        )
-        self._sizes_dict[file_extension] = new_size
+        _add_to_sizes_dict(self._sizes_dict, file_set_size, file_extension)
+
+    def _subtract_file_size(self, file_set_size, file_extension):
+        """
+        Subtract file set size from `_sizes_dict` dictionary
+        """
+        new_size = self._sizes_dict[file_extension] - file_set_size
+        if new_size.total_files == 0:
+            del self._sizes_dict[file_extension]
+        else:
+            self._sizes_dict[file_extension] = new_size
+
+    def _is_entry_excluded(self, entry, relative_path, is_dir, gitignore_matchers):
+        """
+        check if the directory/file is excluded from the code size calculation, either by its path or by a pattern
 
-    def _is_excluded(self, path):
+        :param entry: `os.DirEntry` of the directory/file to check
+        :param relative_path: path of the directory/file relative to the searched directory, using forward slashes
+        :param is_dir: is the entry a directory?
+        :param gitignore_matchers: (relative directory, IgnorePatternMatcher) tuples of the applicable
+            `.gitignore` files
+        """
+        if self._respect_gitignore and (
+            (is_dir and entry.name == GIT_DIRECTORY)
+            or _is_ignored_by_gitignore(relative_path, is_dir, gitignore_matchers)
+        ):
+            return True
+
+        return self._pattern_matcher.is_ignored(
+            relative_path, is_dir
+        ) or self._is_excluded(entry.path, entry)
+
+    def _is_excluded(self, path, entry=None):
         """
         check if the directory/file is excluded from the code size calculation
 
         :param path: path of the directory/file to check
+        :param entry: `os.DirEntry` of the directory/file (if available), its cached stat result is reused
         """
-        return any(os.path.samefile(path, ex) for ex in self._excluded_items)
+        if not self._excluded_ids:
+            return False
+
+        try:
+            stat_result = os.stat(path) if entry is None else entry.stat()
+        except (FileNotFoundError, NotADirectoryError):
+            # removed after it was listed, so there's nothing to count
+            return True
+        return _get_file_id(path, stat_result) in self._excluded_ids
 
     def _check_if_paths_exist(self):
         """
@@ -118,3 +696,154 @@ class CodeSizeCounter:
             raise FileNotFoundError(
                 f"The following paths are not valid {list(invalid_paths)}"
             )
+
+
+def _map_with_bounded_queue(executor, function, items, max_queue_size):
+    """
+    apply the function to the items using the executor
+
+    At most `max_queue_size` items are queued in the executor at once, so the items are consumed lazily
+    (and memory stays flat) while the executor keeps on working.
+
+    :param executor: executor that runs the function
+    :param function: function to apply to the items
+    :param items: iterable of the items
+    :param max_queue_size: maximum number of items submitted to the executor, whose results weren't yielded yet
+    :return: generator of (item, result) tuples, in the order of the items
+    """
+    queue = deque()
+    for item in items:
+        queue.append((item, executor.submit(function, item)))
+        if len(queue) >= max_queue_size:
+            item, future = queue.popleft()
+            yield item, future.result()
+
+    while queue:
+        item, future = queue.popleft()
+        yield item, future.result()
+
+
+def _count_file(file_manager, cache=None):
+    """
+    count the given file
+
+    :param file_manager: FileManager of the file to count
+    :param cache: LinesCountCache used for getting & storing the result (None = don't use cache)
+    :return: FileSetSize of the file, or None if the file can't be decoded (or it was removed after it was listed)
+    """
+    if cache is not None:
+        try:
+            file_size = cache.get(file_manager)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        if file_size is not CACHE_MISS:
+            return file_size
+
+    file_size = _read_file(file_manager)
+    if cache is not None:
+        cache.set(file_manager, file_size)
+    return file_size
+
+
+def _read_file(file_manager):
+    """
+    read the file and count its lines
+
+    :param file_manager: FileManager of the file to count
+    :return: FileSetSize of the file, or None if the file can't be decoded (or it was removed after it was listed)
+    """
+    try:
+        lines_count = file_manager.get_lines_count()
+        # binary files are ignored as well
+        return (
+            None
+            if lines_count is None
+            else FileSetSize(1, lines_count, file_manager.get_size())
+        )
+    except (UnicodeDecodeError, FileNotFoundError, NotADirectoryError):
+        # Ignore files that can't be decoded or that were removed after they were listed
+        return None
+
+
+def _count_batch(file_managers, cache=None):
+    """
+    count a batch of files, this function is executed in worker processes
+
+    The new results are stored in the cache at once after the whole batch is counted, so the worker holds
+    the write lock of the database just for a moment and the other workers can run meanwhile.
+
+    :param file_managers: FileManager objects of the files to count
+    :param cache: LinesCountCache used for getting & storing the results (None = don't use cache)
+    :return: list of FileSetSize objects of the files (None for files that can't be decoded)
+    """
+    if cache is None:
+        return [_read_file(file_manager) for file_manager in file_managers]
+
+    file_sizes = []
+    new_results = []
+    for file_manager in file_managers:
+        file_size = cache.get(file_manager)
+        if file_size is CACHE_MISS:
+            file_size = _read_file(file_manager)
+            new_results.append((file_manager, file_size))
+        file_sizes.append(file_size)
+
+    cache.set_many(new_results)
+    cache.close()
+    return file_sizes
+
+
+def _is_ignored_by_gitignore(relative_path, is_dir, gitignore_matchers):
+    """
+    check if the directory/file is ignored by the `.gitignore` files
+
+    Patterns in deeper `.gitignore` files take precedence over the ones in their parent directories.
+
+    :param relative_path: path of the directory/file relative to the searched directory, using forward slashes
+    :param is_dir: is the path a directory?
+    :param gitignore_matchers: (relative directory, IgnorePatternMatcher) tuples of the applicable
+        `.gitignore` files, ordered from the outermost one
+    """
+    for relative_dir, matcher in reversed(gitignore_matchers):
+        result = matcher.match(relative_path.removeprefix(relative_dir), is_dir)
+        if result is not None:
+            return result
+    return False
+
+
+def _get_stat_key(stat_result):
+    """
+    get values that change whenever the file is modified
+
+    :param stat_result: result of `stat` call on the file
+    :return: tuple (inode, modification time in ns, size)
+    """
+    return stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size
+
+
+def _get_file_id(path, stat_result):
+    """
+    get identifier of the file/directory, which is the same for all paths pointing to it (like `os.path.samefile`)
+
+    :param path: path to the file/directory
+    :param stat_result: result of `stat` call on the path
+    :return: tuple (device, inode)
+    """
+    # on Windows, `os.DirEntry.stat()` doesn't fill the device and inode numbers
+    if stat_result.st_ino == 0 and stat_result.st_dev == 0:
+        stat_result = os.stat(path)
+    return stat_result.st_dev, stat_result.st_ino
+
+
+def _add_to_sizes_dict(sizes_dict, file_set_size, file_extension):
+    """
+    add file set size to the dictionary of FileSetSize objects by file extension
+
+    The sizes are accumulated in place, so no new object is created for each added file.
+    """
+    total_size = sizes_dict.get(file_extension)
+    if total_size is None:
+        # copy the first size, the given object may still be used by the caller
+        sizes_dict[file_extension] = FileSetSize.empty().add_in_place(file_set_size)
+    else:
+        total_size.add_in_place(file_set_size)
@@ -0,0 +1,98 @@
+import os
+
+from code_size_counter.file_tools import ROOT_DIRECTORY_KEY, FileSetSize
+from code_size_counter.listeners import FileListener
+
+
+class DirectoryRollup(FileListener):
+    """
+    listener computing the total sizes of the files per directory, files in the nested directories are added
+    to their ancestors
+
+    The files of each directory are reported together and the directories are visited in depth-first order,
+    so the totals are kept just for the directories on the current path. When the walk leaves a directory,
+    its total is stored and added to its parent.
+    """
+
+    def __init__(self, root_directory, depth=None):
+        """
+        :param root_directory: the directory where the files are searched, the results are relative to it
+        :param depth: maximum depth of the reported directories, relative to the root directory
+            (0 = report just the root directory, None = report all directories)
+        """
+        self._root_directory = root_directory
+        self._depth = depth
+        # dictionary of FileSetSize objects by directory path relative to the root directory
+        self.results = {}
+
+        # (path components, FileSetSize) tuples of the directories on the current path
+        self._stack = [((), FileSetSize.empty())]
+        self._last_directory = None
+
+    def file_counted(self, file_record):
+        directory = os.path.dirname(file_record.path)
+        if directory != self._last_directory:
+            self._last_directory = directory
+            self._enter_directory(self._get_path_components(directory))
+
+        self._stack[-1][1].add_in_place(
+            FileSetSize(1, file_record.lines, file_record.size)
+        )
+
+    def finished(self):
+        while self._stack:
+            self._leave_directory()
+        self._stack.append(((), FileSetSize.empty()))
+        self._last_directory = None
+
+    def _enter_directory(self, components):
+        """
+        leave the directories that don't contain the given one and enter the missing ones on the path to it
+
+        :param components: path components of the directory, relative to the root directory
+        """
+        current_depth = len(self._stack[-1][0])
+        while self._stack[-1][0] != components[:current_depth]:
+            self._leave_directory()
+            current_depth -= 1
+
+        for level in range(current_depth + 1, len(components) + 1):
+            self._stack.append((components[:level], FileSetSize.empty()))
+
+    def _leave_directory(self):
+        """
+        store the total of the current directory and add it to its parent
+        """
+        components, size = self._stack.pop()
+        if self._stack:
+            self._stack[-1][1].add_in_place(size)
+
+        key = os.path.join(*components) if components else ROOT_DIRECTORY_KEY
+        self._store_directory(key, size)
+
+    def _store_directory(self, directory, size):
+        """
+        store the total of the directory, when the walk leaves it
+
+        :param directory: path to the directory relative to the root directory
+        :param size: FileSetSize of the files in the directory (including its subdirectories)
+        """
+        if directory in self.results:
+            # the directory was visited before (possible if the files aren't listed in depth-first order)
+            self.results[directory].add_in_place(size)
+        else:
+            self.results[directory] = size
+
+    def _get_path_components(self, directory):
+        """
+        get path components of the directory relative to the root directory, limited to the maximum depth
+
+        :return: tuple of the components
+        """
+        relative_path = os.path.relpath(directory, self._root_directory)
+        if relative_path == os.curdir:
+            return ()
+
+        components = tuple(relative_path.split(os.sep))
+        max_depth = self._depth
+        return components if max_depth is None else components[:max_depth]
@@ -0,0 +1,59 @@
+from code_size_counter.file_tools import NO_EXTENSION_PLACEHOLDER
+
+
+class ExtensionMatcher:
+    """
+    class matching file names against a set of file extensions
+
+    The extensions are stored in a hash table, so each file name is matched by a few lookups
+    (one per dot in the longest searched extension) regardless of the number of searched extensions.
+    """
+
+    def __init__(self, extensions, ignore_case=False):
+        """
+        :param extensions: searched file extensions without the leading dot (e.g. 'py', 'd.ts' or 'tar.gz'),
+            empty collection = match all files
+        :param ignore_case: match the extensions case-insensitively (e.g. 'py' matches 'main.PY')
+        """
+        self._ignore_case = ignore_case
+        # searched extensions by their normalized form
+        self._extensions = {self._normalize(ext): ext for ext in extensions}
+        # maximum number of dot-separated parts of the searched extensions
+        self._max_parts = max((ext.count(".") + 1 for ext in extensions), default=1)
+
+    def match(self, file_name):
+        """
+        get the extension of the file, if it's one of the searched extensions
+
+        If multiple extensions match (e.g. 'ts' and 'd.ts'), the longest one is returned.
+        If all files are matched, the extension is the part of the name after the last dot.
+
+        :param file_name: name of the file (without the directory)
+        :return: the matching extension (as it was given, if the case is ignored), `NO_EXTENSION_PLACEHOLDER`
+            if all files are matched and the file has no extension, or None if the file doesn't match
+        """
+        if not self._extensions:
+            _, dot, extension = file_name.rpartition(".")
+            if not dot:
+                return NO_EXTENSION_PLACEHOLDER
+            return self._normalize(extension)
+
+        name = self._normalize(file_name)
+        if self._max_parts == 1:
+            _, dot, extension = name.rpartition(".")
+            return self._extensions.get(extension) if dot else None
+
+        # the name without the first part (i.e. the part before the first dot) is a candidate extension,
+        # the candidates are tried from the longest one
+        parts = name.rsplit(".", self._max_parts)
+        for i in range(1, len(parts)):
+            extension = self._extensions.get(".".join(parts[i:]))
+            if extension is not None:
+                return extension
+        return None
+
+    def _normalize(self, extension):
+        """
+        normalize the extension (or file name) for the lookup
+        """
+        return extension.casefold() if self._ignore_case else extension
@@ -0,0 +1,194 @@
+import heapq
+import os
+from array import array
+
+from code_size_counter.file_tools import ROOT_DIRECTORY_KEY, FileRecord, FileSetSize
+from code_size_counter.listeners import FileListener
+
+# NumPy is an optional dependency, the aggregations fall back to pure Python without it
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# columns that can be used for sorting the files
+LINES_COLUMN = "lines"
+SIZE_COLUMN = "size"
+
+
+class FileTable(FileListener):
+    """
+    columnar table of the counted files, filled while the files are counted
+
+    Each file takes just a few bytes - the columns are stored in typed arrays and the file names in a single buffer,
+    the directories and extensions are stored only once.
+    The aggregations are vectorized by NumPy if it's installed.
+    """
+
+    def __init__(self, root_directory):
+        """
+        :param root_directory: the directory where the files are searched, the per-directory results are relative to it
+        """
+        self._root_directory = root_directory
+
+        self._directories = []
+        self._directory_ids = {}
+        self._extensions = []
+        self._extension_ids = {}
+
+        # columns of the table
+        self._file_directory_ids = array("I")
+        self._file_extension_ids = array("I")
+        self._lines = array("q")
+        self._sizes = array("q")
+        # file names are stored one after another, file i is in `_names[_name_offsets[i]:_name_offsets[i + 1]]`
+        self._names = bytearray()
+        self._name_offsets = array("Q", [0])
+
+    def file_counted(self, file_record):
+        directory, name = os.path.split(file_record.path)
+        self._file_directory_ids.append(
+            _get_id(directory, self._directories, self._directory_ids)
+        )
+        self._file_extension_ids.append(
+            _get_id(file_record.extension, self._extensions, self._extension_ids)
+        )
+        self._lines.append(file_record.lines)
+        self._sizes.append(file_record.size)
+        self._names += os.fsencode(name)
+        self._name_offsets.append(len(self._names))
+
+    def get_file(self, index):
+        """
+        get the file in the given row of the table
+
+        :param index: index of the row
+        :return: FileRecord of the file
+        """
+        start = self._name_offsets[index]
+        end = self._name_offsets[index + 1]
+        name = os.fsdecode(bytes(self._names[start:end]))
+        return FileRecord(
+            os.path.join(self._directories[self._file_directory_ids[index]], name),
+            self._extensions[self._file_extension_ids[index]],
+            self._lines[index],
+            self._sizes[index],
+        )
+
+    def per_extension(self):
+        """
+        get the total sizes of the files by their extension
+
+        :return: dictionary of FileSetSize objects by file extension
+        """
+        totals = self._group_by(self._file_extension_ids, len(self._extensions))
+        return {
+            self._extensions[extension_id]: size
+            for extension_id, size in enumerate(totals)
+            if size.total_files
+        }
+
+    def per_directory(self, depth=None):
+        """
+        get the total sizes of the files by directory, files in the nested directories are added to their ancestors
+
+        :param depth: maximum depth of the reported directories, relative to the root directory
+            (0 = report just the root directory, None = report all directories)
+        :return: dictionary of FileSetSize objects by directory path relative to the root directory
+            (the root directory itself is reported as '.')
+        """
+        totals = self._group_by(self._file_directory_ids, len(self._directories))
+
+        result = {}
+        for directory_id, size in enumerate(totals):
+            relative_path = os.path.relpath(
+                self._directories[directory_id], self._root_directory
+            )
+            parts = [] if relative_path == os.curdir else relative_path.split(os.sep)
+            if depth is not None:
+                parts = parts[:depth]
+
+            for level in range(len(parts) + 1):
+                key = os.path.join(*parts[:level]) if level else ROOT_DIRECTORY_KEY
+                if key in result:
+                    result[key].add_in_place(size)
+                else:
+                    result[key] = FileSetSize.empty() + size
+        return result
+
+    def top_files(self, count, column=LINES_COLUMN):
+        """
+        get the largest files
+
+        :param count: number of the files to return
+        :param column: column to sort the files by (`LINES_COLUMN` or `SIZE_COLUMN`)
+        :return: list of FileRecord objects, the largest file goes first
+        """
+        values = self._lines if column == LINES_COLUMN else self._sizes
+        count = min(count, len(values))
+        if count <= 0:
+            return []
+
+        if numpy is not None:
+            values_array = numpy.frombuffer(values, dtype=numpy.int64)
+            indexes = numpy.argpartition(values_array, -count)[-count:]
+            indexes = indexes[numpy.argsort(-values_array[indexes], kind="stable")]
+            indexes = indexes.tolist()
+        else:
+            indexes = heapq.nlargest(count, range(len(values)), key=values.__getitem__)
+        return [self.get_file(index) for index in indexes]
+
+    def _group_by(self, group_ids, groups_count):
+        """
+        sum the columns of the files by the given groups
+
+        :param group_ids: array of group ids of the files
+        :param groups_count: number of the groups
+        :return: list of FileSetSize objects indexed by group id
+        """
+        if numpy is not None:
+            ids = numpy.frombuffer(group_ids, dtype=numpy.uint32)
+            files = numpy.bincount(ids, minlength=groups_count)
+            lines = _sum_by_group(ids, self._lines, groups_count)
+            sizes = _sum_by_group(ids, self._sizes, groups_count)
+            return [
+                FileSetSize(*values)
+                for values in zip(files.tolist(), lines.tolist(), sizes.tolist())
+            ]
+
+        totals = [FileSetSize.empty() for _ in range(groups_count)]
+        for group_id, lines, size in zip(group_ids, self._lines, self._sizes):
+            totals[group_id].add_in_place(FileSetSize(1, lines, size))
+        return totals
+
+    def __len__(self):
+        return len(self._lines)
+
+
+def _sum_by_group(ids, values, groups_count):
+    """
+    sum the values by the group ids using NumPy
+
+    :param ids: NumPy array of the group ids
+    :param values: array of the values (signed 64-bit integers)
+    :param groups_count: number of the groups
+    :return: NumPy array of the sums indexed by group id
+    """
+    sums = numpy.zeros(groups_count, dtype=numpy.int64)
+    numpy.add.at(sums, ids, numpy.frombuffer(values, dtype=numpy.int64))
+    return sums
+
+
+def _get_id(value, values, ids):
+    """
+    get id of the value, the value is assigned a new id if it doesn't have one yet
+
+    :param value: the value
+    :param values: list of the values indexed by their id
+    :param ids: dictionary of the ids by the value
+    """
+    value_id = ids.get(value)
+    if value_id is None:
+        value_id = ids[value] = len(values)
+        values.append(value)
+    return value_id
@@ -1,7 +1,38 @@
+import io
 import os
+from collections import namedtuple
+from itertools import chain
 
 NO_EXTENSION_PLACEHOLDER = "(NONE)"
 
+# size of the chunks (in bytes) read when counting lines in binary mode or in memory-mapped files
+READ_CHUNK_SIZE = 1024 * 1024
+
+# number of bytes at the beginning of the file, which are checked when detecting binary files
+SNIFF_SIZE = 8 * 1024
+
+# signatures (magic numbers) of common binary formats, e.g. images, archives and executables;
+# just the ones with non-text bytes, because a text file may start e.g. with 'RIFF' or '%PDF-'
+# (files of such formats are detected by the NUL bytes or they can't be decoded anyway)
+BINARY_SIGNATURES = (
+    b"\x89PNG\r\n\x1a\n",
+    b"\xff\xd8\xff",  # JPEG
+    b"PK\x03\x04",  # ZIP, JAR, DOCX, ...
+    b"\x1f\x8b",  # gzip
+    b"\xfd7zXZ\x00",
+    b"7z\xbc\xaf\x27\x1c",
+    b"Rar!\x1a\x07",
+    b"\x28\xb5\x2f\xfd",  # Zstandard
+    b"\x7fELF",
+    b"\xca\xfe\xba\xbe",  # Java class, Mach-O universal binary
+    b"\xcf\xfa\xed\xfe",  # Mach-O
+    b"\x00asm",  # WebAssembly
+    b"SQLite format 3\x00",
+)
+
+# key of the searched directory itself in the results per directory
+ROOT_DIRECTORY_KEY = "."
+
 
 class FileSetSize:
     """
@@ -13,6 +44,9 @@ class FileSetSize:
      of a set of files
     """
 
+    # no per-instance __dict__, there's an instance per each counted file
+    __slots__ = ("total_size", "total_lines", "total_files")
+
     def __init__(
         self,
         total_files,
@@ -43,9 +77,42 @@ class FileSetSize:
             self.total_size + other.total_size,
         )
 
+    def add_in_place(self, other):
+        """
+        add FileSetSize to this object in place (without creating a new object)
+
+        :param other:
+        :return: this object
+        """
+        self.total_files += other.total_files
+        self.total_lines += other.total_lines
+        self.total_size += other.total_size
+        return self
+
+    def subtract(self, other):
+        """
+        subtract FileSetSize from this object
+
+        e.g. subtract the corresponding fields
+
+        :param other:
+        :return: New fileset size with corresponding fields subtracted
+        """
+        return FileSetSize(
+            self.total_files - other.total_files,
+            self.total_lines - other.total_lines,
+            self.total_size - other.total_size,
+        )
+
     def __add__(self, other):
         return self.add(other)
 
+    def __iadd__(self, other):
+        return self.add_in_place(other)
+
+    def __sub__(self, other):
+        return self.subtract(other)
+
     def __eq__(self, other):
         return (
             self.total_size == other.total_size
@@ -66,26 +133,89 @@ class FileSetSize:
         return FileSetSize(0, 0, 0)
 
 
+class FileRecord(namedtuple("FileRecord", ["path", "extension", "lines", "size"])):
+    """
+    class representing a single counted file
+     - path to the file
+     - file extension
+     - number of lines
+     - size (in bytes)
+    """
+
+    __slots__ = ()
+
+
 class FileManager:
     """
     Helper class for file management
     """
 
-    def __init__(self, file_path):
+    def __init__(
+        self,
+        file_path,
+        stat_result=None,
+        fast_line_count=False,
+        mmap_threshold=None,
+        extension=None,
+    ):
+        """
+        :param file_path: path to the file
+        :param stat_result: result of `stat` call on the file, if it's already known (e.g. from `os.DirEntry.stat()`)
+        :param fast_line_count: count lines by searching for newlines in binary mode, without decoding the file
+        :param mmap_threshold: if the file has at least this size (in bytes), its lines are counted
+            by searching for newlines in a memory-mapped file (None = never map the file)
+        :param extension: extension of the file, if it's already known (e.g. from ExtensionMatcher)
+        """
         self.file_path = file_path
+        self.extension = extension
+        self.stat_result = stat_result
+        self.fast_line_count = fast_line_count
+        self.mmap_threshold = mmap_threshold
+        # is the file binary? (None = not detected yet)
+        self.binary = None
+
+    def get_stat(self):
+        """
+        get result of `stat` call on the file
+        """
+        if self.stat_result is None:
+            self.stat_result = os.stat(self.file_path)
+        return self.stat_result
 
     def get_size(self):
         """
         get size of the file in bytes
         """
-        return os.path.getsize(self.file_path)
+        return self.get_stat().st_size
 
     def get_lines_count(self):
         """
         get number of lines in the file
+
+        Binary files are detected by the first `SNIFF_SIZE` bytes (if they contain a NUL byte or if the file starts
+        with a signature of a common binary format), before the rest of the file is read.
+
+        :return: number of lines or None if the file is binary
+        """
+        if self._uses_mmap():
+            return self._count_newlines_mmap()
+
+        if self.fast_line_count:
+            return self._count_newlines()
+
+        with open(self.file_path, "rb") as binary_file:
+            if self._detect_binary(binary_file.read(SNIFF_SIZE)):
+                return None
+
+            binary_file.seek(0)
+            with io.TextIOWrapper(binary_file) as file:
+                return sum(1 for _ in file)
+
+    def counts_lines_in_binary_mode(self):
+        """
+        check if lines of the file are counted in binary mode (either read in binary mode or memory-mapped)
         """
-        with open(self.file_path, "r") as file:
-            return sum(1 for _ in file)
+        return self.fast_line_count or self._uses_mmap()
 
     def has_one_of_extensions(self, extensions):
         """
@@ -99,6 +229,9 @@ class FileManager:
         """
         get file extension
         """
+        if self.extension is not None:
+            return self.extension
+
         path_after_dot = self.file_path.split(".")[-1]
 
         if any(delim in path_after_dot for delim in ["/", "\\"]):
@@ -106,6 +239,68 @@ class FileManager:
         else:
             return path_after_dot
 
+    def _uses_mmap(self):
+        """
+        check if lines of the file are counted in the memory-mapped file
+        """
+        # empty files can't be memory-mapped
+        return self.mmap_threshold is not None and self.get_size() >= max(
+            self.mmap_threshold, 1
+        )
+
+    def _count_newlines(self):
+        """
+        get number of lines in the file by counting newline characters, the file is read in binary mode
+        """
+        with open(self.file_path, "rb") as file:
+            first_chunk = file.read(READ_CHUNK_SIZE)
+            if self._detect_binary(first_chunk[:SNIFF_SIZE]):
+                return None
+            if not first_chunk:
+                return 0
+
+            return _count_lines_in_chunks(
+                chain([first_chunk], iter(lambda: file.read(READ_CHUNK_SIZE), b""))
+            )
+
+    def _count_newlines_mmap(self):
+        """
+        get number of lines in the file by counting newline characters in the memory-mapped file
+
+        The mapped file is scanned in windows of `READ_CHUNK_SIZE` bytes, so at most one window
+        is copied into memory at a time.
+        """
+        import mmap
+
+        with open(self.file_path, "rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped_file:
+            if self._detect_binary(mapped_file[:SNIFF_SIZE]):
+                return None
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped_file.madvise(mmap.MADV_SEQUENTIAL)
+
+            file_size = len(mapped_file)
+            return _count_lines_in_chunks(
+                mapped_file[start:end]
+                for start, end in zip(
+                    range(0, file_size, READ_CHUNK_SIZE),
+                    range(
+                        READ_CHUNK_SIZE, file_size + READ_CHUNK_SIZE, READ_CHUNK_SIZE
+                    ),
+                )
+            )
+
+    def _detect_binary(self, header):
+        """
+        detect if the file is binary by its first bytes and store the result
+
+        :param header: first `SNIFF_SIZE` bytes of the file (or the whole file if it's shorter)
+        :return: is the file binary?
+        """
+        self.binary = b"\0" in header or header.startswith(BINARY_SIGNATURES)
+        return self.binary
+
     def _has_extension(self, extension):
         """
         check if the file has given file extension (e.g. '.py')
@@ -115,8 +310,63 @@ class FileManager:
         return self.file_path.endswith(f".{extension}")
 
 
+def _count_lines_in_chunks(chunks):
+    """
+    count lines in the file with the given content, by counting newline characters
+
+    Newline at the end of the file isn't counted as an extra line (same as when iterating over a file in text mode).
+
+    :param chunks: iterable of non-empty bytes objects, which form the content of the file
+    """
+    lines_count = 0
+    last_byte = b"\n"
+    for chunk in chunks:
+        lines_count += chunk.count(b"\n")
+        last_byte = chunk[-1:]
+
+    # count the last line, if it doesn't end with a newline
+    if last_byte != b"\n":
+        lines_count += 1
+    return lines_count
+
+
 def get_path_with_slashes(path):
     """
     get path using forward slashes (e.g. replace back-slash by forward slash on Windows)
     """
     return path.replace("\\", "/")
+
+
+def list_git_files(directory):
+    """
+    list files tracked by git in the directory (read from the git index by `git ls-files`)
+
+    :param directory: directory inside a git working tree
+    :return: generator of paths relative to the directory, using forward slashes
+    """
+    # imported here (like the other modules needed just by some options), so that the startup stays fast
+    import subprocess
+
+    with subprocess.Popen(
+        ["git", "ls-files", "-z"],
+        cwd=directory,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    ) as process:
+        remainder = b""
+        last_path = None
+        for chunk in iter(lambda: process.stdout.read(READ_CHUNK_SIZE), b""):
+            paths = (remainder + chunk).split(b"\0")
+            remainder = paths.pop()
+            for path in paths:
+                # files with merge conflicts are listed once per stage
+                if path != last_path:
+                    yield os.fsdecode(path)
+                last_path = path
+
+        error_message = process.stderr.read().decode(errors="replace").strip()
+
+    if process.returncode != 0:
+        raise ValueError(
+            f"Can't list files tracked by git in {get_path_with_slashes(str(directory))}: {error_message}"
+        )
@@ -0,0 +1,151 @@
+import math
+from bisect import bisect_right
+
+from code_size_counter.listeners import FileListener
+
+# relative accuracy of the quantiles estimated by QuantileSketch
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+# quantiles reported for each distribution
+REPORTED_QUANTILES = (0.5, 0.9, 0.99)
+
+# lower bounds of the histogram buckets (0, 1-9, 10-99, 100-999, ...)
+BUCKET_BOUNDS = (0,) + tuple(10**exponent for exponent in range(19))
+
+
+class QuantileSketch:
+    """
+    streaming sketch estimating quantiles of non-negative numbers with a bounded relative error
+
+    The values are counted in logarithmic buckets, bucket i contains values in (gamma^(i-1), gamma^i].
+    So the memory depends just on the range of the values (e.g. ~1000 buckets for values up to 10^9
+    with 1% accuracy), not on their number.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        """
+        :param relative_accuracy: maximum relative error of the estimated quantiles (e.g. 0.01 = 1%)
+        """
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        # numbers of the values by bucket index
+        self._buckets = {}
+        self._zero_count = 0
+        self.count = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """
+        add the value to the sketch
+        """
+        self.count += 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+        if value <= 0:
+            self._zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def quantile(self, q):
+        """
+        estimate the quantile of the added values
+
+        :param q: the quantile (between 0 and 1, e.g. 0.5 = median)
+        :return: the estimated value or None if no values were added
+        """
+        if self.count == 0:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = self._zero_count
+        if seen > rank:
+            return 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen > rank:
+                estimate = 2 * self._gamma**index / (self._gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+
+class Distribution:
+    """
+    class representing distribution of a metric of files (e.g. lines) - histogram with logarithmic buckets
+    and quantiles estimated by QuantileSketch
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        """
+        :param relative_accuracy: maximum relative error of the estimated quantiles
+        """
+        # numbers of the files by index of the bucket in `BUCKET_BOUNDS`
+        self._bucket_counts = [0] * len(BUCKET_BOUNDS)
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, value):
+        """
+        add the value of a file to the distribution
+        """
+        self._bucket_counts[bisect_right(BUCKET_BOUNDS, value) - 1] += 1
+        self.sketch.add(value)
+
+    def get_buckets(self):
+        """
+        get the histogram, from the smallest to the largest non-empty bucket
+
+        :return: list of (lower bound, upper bound, number of files) tuples, the bounds are inclusive
+            (upper bound of the last bucket is None)
+        """
+        non_empty = [i for i, count in enumerate(self._bucket_counts) if count]
+        if not non_empty:
+            return []
+
+        upper_bounds = [bound - 1 for bound in BUCKET_BOUNDS[1:]] + [None]
+        return [
+            (BUCKET_BOUNDS[i], upper_bounds[i], self._bucket_counts[i])
+            for i in range(non_empty[0], non_empty[-1] + 1)
+        ]
+
+    def get_quantiles(self):
+        """
+        get the estimated quantiles, rounded to integers
+
+        :return: list of the estimated values of `REPORTED_QUANTILES` (None if there are no files)
+        """
+        return [
+            None if value is None else round(value)
+            for value in (self.sketch.quantile(q) for q in REPORTED_QUANTILES)
+        ]
+
+
+class Histograms(FileListener):
+    """
+    listener collecting distributions of the lines and sizes of the files per file extension
+
+    Just the histograms and sketches are kept, not the values of the single files.
+    """
+
+    def __init__(self, relative_accuracy=DEFAULT_RELATIVE_ACCURACY):
+        """
+        :param relative_accuracy: maximum relative error of the estimated quantiles
+        """
+        self._relative_accuracy = relative_accuracy
+        # Distribution objects by file extension
+        self.lines = {}
+        self.sizes = {}
+
+    def file_counted(self, file_record):
+        lines = self.lines.get(file_record.extension)
+        if lines is None:
+            lines = self.lines[file_record.extension] = Distribution(
+                self._relative_accuracy
+            )
+            self.sizes[file_record.extension] = Distribution(self._relative_accuracy)
+
+        lines.add(file_record.lines)
+        self.sizes[file_record.extension].add(file_record.size)
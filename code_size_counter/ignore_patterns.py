@@ -0,0 +1,166 @@
+import re
+
+NEGATION_PREFIX = "!"
+COMMENT_PREFIX = "#"
+
+
+class IgnorePatternMatcher:
+    """
+    class matching paths against a list of patterns in gitignore syntax
+
+    All patterns are compiled into a single regular expression (one for directories and one for files),
+    so each path is matched by a single regex call regardless of the number of patterns.
+    """
+
+    def __init__(self, patterns):
+        """
+        :param patterns: patterns in gitignore syntax (e.g. 'node_modules/', '*.min.js' or '!keep.min.js')
+        """
+        # (regex, is_negated, is_dir_only) tuples
+        parsed_patterns = [
+            parsed
+            for parsed in (_parse_pattern(pattern) for pattern in patterns)
+            if parsed is not None
+        ]
+        self._has_negations = any(negated for _, negated, _ in parsed_patterns)
+
+        # the last matching pattern decides, so the patterns are tried in reversed order
+        parsed_patterns.reverse()
+        self._negated = [negated for _, negated, _ in parsed_patterns]
+        self._dir_regex = _compile_alternatives(
+            (i, regex) for i, (regex, _, _) in enumerate(parsed_patterns)
+        )
+        self._file_regex = _compile_alternatives(
+            (i, regex)
+            for i, (regex, _, dir_only) in enumerate(parsed_patterns)
+            if not dir_only
+        )
+
+    def match(self, relative_path, is_dir):
+        """
+        match the path against the patterns
+
+        :param relative_path: path relative to the directory of the patterns, using forward slashes
+        :param is_dir: is the path a directory?
+        :return: True if the path is ignored, False if it's explicitly re-included by a negated pattern,
+            None if no pattern matches the path
+        """
+        regex = self._dir_regex if is_dir else self._file_regex
+        if regex is None:
+            return None
+
+        match = regex.fullmatch(relative_path)
+        if match is None:
+            return None
+        if not self._has_negations:
+            return True
+        return not self._negated[int(match.lastgroup[1:])]
+
+    def is_ignored(self, relative_path, is_dir):
+        """
+        check if the path is ignored by the patterns
+
+        :param relative_path: path relative to the directory of the patterns, using forward slashes
+        :param is_dir: is the path a directory?
+        """
+        return self.match(relative_path, is_dir) is True
+
+    def __bool__(self):
+        return self._dir_regex is not None
+
+
+def _compile_alternatives(indexed_regexes):
+    """
+    compile the regexes into a single regex, whose alternatives are named by the index of the pattern
+
+    :param indexed_regexes: iterable of (index, regex) tuples
+    :return: compiled regex or None if there are no regexes
+    """
+    alternatives = [f"(?P<p{i}>{regex})" for i, regex in indexed_regexes]
+    return re.compile("|".join(alternatives)) if alternatives else None
+
+
+def _parse_pattern(pattern):
+    """
+    parse the pattern in gitignore syntax
+
+    :param pattern: the pattern to parse
+    :return: tuple (regex, is_negated, is_dir_only) or None if the pattern is blank or a comment
+    """
+    # trailing spaces are ignored unless they're escaped
+    pattern = pattern.rstrip("\n")
+    while pattern.endswith(" ") and not pattern.endswith("\\ "):
+        pattern = pattern[:-1]
+
+    if not pattern or pattern.startswith(COMMENT_PREFIX):
+        return None
+
+    negated = pattern.startswith(NEGATION_PREFIX)
+    if negated:
+        pattern = pattern[1:]
+
+    dir_only = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    if not pattern:
+        return None
+
+    # patterns with a slash are relative to the directory, other ones match at any level
+    if "/" in pattern:
+        regex = _translate(pattern.lstrip("/"))
+    else:
+        regex = "(?:.*/)?" + _translate(pattern)
+    return regex, negated, dir_only
+
+
+def _translate(pattern):
+    """
+    translate the gitignore pattern (without the negation prefix and trailing slash) to a regex
+    """
+    result = []
+    i = 0
+    n = len(pattern)
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/"):
+            if i + 2 == n:  # trailing '**' matches everything inside
+                result.append(".*")
+                i += 2
+                continue
+            if pattern[i + 2] == "/":  # '**/' matches zero or more directories
+                result.append("(?:.*/)?")
+                i += 3
+                continue
+
+        i += 1
+        if c == "*":
+            while i < n and pattern[i] == "*":
+                i += 1
+            result.append("[^/]*")
+        elif c == "?":
+            result.append("[^/]")
+        elif c == "\\" and i < n:
+            result.append(re.escape(pattern[i]))
+            i += 1
+        elif c == "[":
+            j = i
+            if j < n and pattern[j] in "!^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                result.append("\\[")
+            else:
+                char_class = pattern[i:j]
+                negated_class = char_class[0] in "!^"
+                if negated_class:
+                    char_class = char_class[1:]
+                char_class = "".join(
+                    ch if ch == "-" else re.escape(ch) for ch in char_class
+                )
+                result.append(f"(?!/)[{'^' if negated_class else ''}{char_class}]")
+                i = j + 1
+        else:
+            result.append(re.escape(c))
+    return "".join(result)
@@ -0,0 +1,114 @@
+import heapq
+from itertools import count as count_from
+
+from code_size_counter.directory_rollup import DirectoryRollup
+from code_size_counter.file_tools import ROOT_DIRECTORY_KEY, FileSetSize
+from code_size_counter.listeners import FileListener
+
+
+class LargestItems(FileListener):
+    """
+    listener collecting the largest files and directories, both by lines and by size
+
+    The items are kept in bounded min-heaps, so the memory doesn't depend on the number of files.
+    The directories are compared by the total of all their files (including subdirectories),
+    the root directory itself isn't reported.
+    """
+
+    def __init__(self, root_directory, count):
+        """
+        :param root_directory: the directory where the files are searched, the directories are reported
+            relative to it
+        :param count: number of the largest items to collect
+        """
+        self._count = count
+        # (value, path, sequence number, FileSetSize) tuples, the smallest item is the first one
+        # (the sequence number makes the items comparable even if a directory is added twice)
+        self._files_by_lines = []
+        self._files_by_size = []
+        self._directories_by_lines = []
+        self._directories_by_size = []
+        self._directory_rollup = _DirectoryRollupToHeaps(root_directory, self)
+        self._sequence = count_from()
+
+    def file_counted(self, file_record):
+        file_size = FileSetSize(1, file_record.lines, file_record.size)
+        self._push(self._files_by_lines, file_record.lines, file_record.path, file_size)
+        self._push(self._files_by_size, file_record.size, file_record.path, file_size)
+        self._directory_rollup.file_counted(file_record)
+
+    def finished(self):
+        self._directory_rollup.finished()
+
+    def get_files_by_lines(self):
+        """
+        get the files with the most lines
+
+        :return: list of (path, FileSetSize) tuples, the largest file goes first
+        """
+        return _get_sorted_items(self._files_by_lines)
+
+    def get_files_by_size(self):
+        """
+        get the largest files by size
+
+        :return: list of (path, FileSetSize) tuples, the largest file goes first
+        """
+        return _get_sorted_items(self._files_by_size)
+
+    def get_directories_by_lines(self):
+        """
+        get the directories with the most lines
+
+        :return: list of (path relative to the root directory, FileSetSize) tuples, the largest directory goes first
+        """
+        return _get_sorted_items(self._directories_by_lines)
+
+    def get_directories_by_size(self):
+        """
+        get the largest directories by size
+
+        :return: list of (path relative to the root directory, FileSetSize) tuples, the largest directory goes first
+        """
+        return _get_sorted_items(self._directories_by_size)
+
+    def add_directory(self, directory, size):
+        """
+        add the directory with its total size to the collected directories
+        """
+        if directory == ROOT_DIRECTORY_KEY:
+            return
+        self._push(self._directories_by_lines, size.total_lines, directory, size)
+        self._push(self._directories_by_size, size.total_size, directory, size)
+
+    def _push(self, heap, value, path, size):
+        """
+        add the item to the heap, if it's full the smallest item is removed
+        """
+        item = (value, path, next(self._sequence), size)
+        if len(heap) < self._count:
+            heapq.heappush(heap, item)
+        elif heap and item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+
+class _DirectoryRollupToHeaps(DirectoryRollup):
+    """
+    DirectoryRollup passing the total of each directory to LargestItems instead of storing it
+    """
+
+    def __init__(self, root_directory, largest_items):
+        super().__init__(root_directory)
+        self._largest_items = largest_items
+
+    def _store_directory(self, directory, size):
+        self._largest_items.add_directory(directory, size)
+
+
+def _get_sorted_items(heap):
+    """
+    get items of the heap sorted from the largest one
+
+    :return: list of (path, FileSetSize) tuples
+    """
+    return [(path, size) for _, path, _, size in sorted(heap, reverse=True)]
@@ -0,0 +1,25 @@
+class FileListener:
+    """
+    base class of the objects notified about the files processed by CodeSizeCounter
+
+    The files are reported in the order they were found, files of each directory are reported together.
+    """
+
+    def file_counted(self, file_record):
+        """
+        called when a file is counted
+
+        :param file_record: FileRecord of the file
+        """
+
+    def file_skipped(self, file_path):
+        """
+        called when a file is skipped, because it can't be decoded
+
+        :param file_path: path to the file
+        """
+
+    def finished(self):
+        """
+        called when all files are processed
+        """
@@ -1,12 +1,38 @@
 from functools import reduce
+import csv
+import json
 import os
+import sys
 from argparse import ArgumentParser
 
-from prettytable import FRAME, PrettyTable
+from code_size_counter.cache import get_default_cache_path
+from code_size_counter.code_size_counter import (
+    ALL_METRICS,
+    FILES_METRIC,
+    FILESYSTEM_SOURCE,
+    GIT_SOURCE,
+    SIZE_METRIC,
+    CodeSizeCounter,
+)
+from code_size_counter.directory_rollup import DirectoryRollup
+from code_size_counter.file_tools import NO_EXTENSION_PLACEHOLDER, FileSetSize
+from code_size_counter.histogram import REPORTED_QUANTILES, Histograms
+from code_size_counter.largest_items import LargestItems
+from code_size_counter.ndjson_writer import NdjsonWriter
+from code_size_counter.progress import ProgressReporter
 
+# metrics computed when just the selected value is printed (-p argument)
+METRICS_TO_PRINT = {
+    "kb_size": (FILES_METRIC, SIZE_METRIC),
+    "lines": ALL_METRICS,
+    "files": (FILES_METRIC,),
+}
 
-from code_size_counter.code_size_counter import CodeSizeCounter
-from code_size_counter.file_tools import NO_EXTENSION_PLACEHOLDER, FileSetSize
+# output formats
+TABLE_FORMAT = "table"
+JSON_FORMAT = "json"
+CSV_FORMAT = "csv"
+NDJSON_FORMAT = "ndjson"
 
 
 def format_to_kilobytes(total_bytes):
@@ -52,14 +78,30 @@ def config_args():
         nargs="+",
         default=[],
         help="extensions of the files that we're searching (separated by spaces) for. Do not prefix them "
-        'with a dot (e.g. use "py" instead of ".py"). Leave empty if you want to search for all files regardless of their extension.',
+        'with a dot (e.g. use "py" instead of ".py"). Extensions can have multiple parts (e.g. "d.ts" or "tar.gz"), '
+        "the longest matching extension is used. Leave empty if you want to search for all files regardless of "
+        "their extension.",
+    )
+    parser.add_argument(
+        "--ignore-extension-case",
+        default=False,
+        action="store_true",
+        help="If present, the file extensions are matched case-insensitively (e.g. py matches main.PY)",
     )
     parser.add_argument(
         "-l",
         "--log",
         default=False,
         action="store_true",
-        help="If present, the program prints its progress (e.g. 'file XXX processed')",
+        help="If present, the program prints a line about each processed file (e.g. 'file XXX processed')",
+    )
+    parser.add_argument(
+        "--progress",
+        default=False,
+        action="store_true",
+        help="If present, the program reports its progress (number of processed files and bytes, processing speed "
+        "and the current directory) to the standard error output, the report is refreshed 10 times per second "
+        "(or printed as a new line every 10 seconds, if the output isn't a terminal)",
     )
     parser.add_argument(
         "-x",
@@ -69,13 +111,140 @@ def config_args():
         help="path to directories & files to exclude (separated by spaces). These paths are relative "
         "to the given directory (-d parameter)",
     )
+    parser.add_argument(
+        "--exclude-pattern",
+        nargs="+",
+        default=[],
+        help="patterns of directories & files to exclude (separated by spaces) in gitignore syntax, "
+        "e.g. node_modules/ or '*.min.js'. The patterns are relative to the given directory (-d parameter)",
+    )
+    parser.add_argument(
+        "--respect-gitignore",
+        default=False,
+        action="store_true",
+        help="If present, directories & files ignored by .gitignore files (and the .git directory) are excluded",
+    )
+    parser.add_argument(
+        "--source",
+        choices=[FILESYSTEM_SOURCE, GIT_SOURCE],
+        default=FILESYSTEM_SOURCE,
+        help="Where to get the list of files from - either walk the directory tree (default) or take the files "
+        "tracked by git, which skips untracked files (e.g. build outputs) without visiting them",
+    )
     parser.add_argument(
         "-p",
         "--print",
         choices=["kb_size", "lines", "files"],
-        help="Print just the selected value (KB size, total files or lines of code)",
+        help="Print just the selected value (KB size, total files or lines of code). When printing KB size or total "
+        "files, the files aren't read, so files that can't be decoded are counted as well",
+    )
+    parser.add_argument(
+        "--format",
+        choices=[TABLE_FORMAT, JSON_FORMAT, CSV_FORMAT, NDJSON_FORMAT],
+        default=TABLE_FORMAT,
+        help="Output format - the table of the results (default), the results in JSON or CSV (sizes in bytes) "
+        "or one JSON record per file (path, extension, lines, bytes) printed as the files are counted",
+    )
+    parser.add_argument(
+        "--by-directory",
+        nargs="?",
+        type=int,
+        const=1,
+        default=None,
+        metavar="DEPTH",
+        help="If present, the program prints also the totals per directory (including the files in its "
+        "subdirectories) up to the given depth. Default depth is 1 (the given directory and its subdirectories)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=None,
+        metavar="N",
+        help="If present, the program prints also the N largest files and directories (including the files "
+        "in their subdirectories), both by lines and by size",
+    )
+    parser.add_argument(
+        "--histogram",
+        default=False,
+        action="store_true",
+        help="If present, the program prints also the distribution of lines and sizes of the files per extension - "
+        "histograms with logarithmic buckets and approximate percentiles (p50, p90 and p99)",
+    )
+    parser.add_argument(
+        "--fast-line-count",
+        default=False,
+        action="store_true",
+        help="If present, lines are counted by searching for newlines in binary mode, without decoding the files. "
+        "Note that binary files (detected by their first bytes) are skipped, but other files that can't be decoded "
+        "aren't skipped in this mode",
+    )
+    parser.add_argument(
+        "--mmap-threshold",
+        type=float,
+        default=None,
+        help="Count lines of the files larger than the given size (in KB) using memory-mapped files. "
+        "These files are counted in binary mode (see --fast-line-count)",
+    )
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=get_default_cache_path(),
+        default=None,
+        metavar="CACHE_FILE",
+        help="If present, the results are cached and files that weren't modified since the last run aren't read "
+        "again. Optionally, specify path to the cache file (default is ~/.cache/code-size-counter/"
+        "lines-count.sqlite3)",
+    )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        default=False,
+        action="store_true",
+        help="If present, the program keeps on running and prints the updated results whenever the files change "
+        "(just the added or modified files are read again). Stop it by Ctrl+C",
+    )
+    parallelism_group = parser.add_mutually_exclusive_group()
+    parallelism_group.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used for counting the files. Default is 1 (count the files in a single process)",
+    )
+    parallelism_group.add_argument(
+        "--io-threads",
+        type=int,
+        default=0,
+        help="Number of threads reading the files while the directory tree is walked. Useful on network "
+        "filesystems (e.g. NFS), where the program waits for I/O rather than computes",
     )
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.by_directory is not None and args.by_directory < 0:
+        parser.error("argument --by-directory: DEPTH must be at least 0")
+    if args.top is not None and args.top < 1:
+        parser.error("argument --top: N must be at least 1")
+    if args.watch:
+        for name, is_used in [
+            ("--by-directory", args.by_directory is not None),
+            ("--top", args.top is not None),
+            ("--histogram", args.histogram),
+        ]:
+            if is_used:
+                parser.error(f"argument {name}: not allowed with argument -w/--watch")
+    if args.format == NDJSON_FORMAT:
+        for name, is_used in [
+            ("-p/--print", args.print is not None),
+            ("-l/--log", args.log),
+            ("--by-directory", args.by_directory is not None),
+            ("--top", args.top is not None),
+            ("--histogram", args.histogram),
+            ("-w/--watch", args.watch),
+        ]:
+            if is_used:
+                parser.error(
+                    f"argument --format {NDJSON_FORMAT}: not allowed with argument {name}"
+                )
+    return args
 
 
 def main():
@@ -83,37 +252,133 @@ def main():
     file_extensions = tuple(args.extension)
     excluded_items = tuple([os.path.join(args.directory, ex) for ex in args.exclude])
 
+    mmap_threshold = (
+        None if args.mmap_threshold is None else int(args.mmap_threshold * 1024)
+    )
+
+    listeners = []
+    directory_rollup = None
+    if args.by_directory is not None:
+        directory_rollup = DirectoryRollup(args.directory, args.by_directory)
+        listeners.append(directory_rollup)
+    largest_items = None
+    if args.top is not None:
+        largest_items = LargestItems(args.directory, args.top)
+        listeners.append(largest_items)
+    histograms = None
+    if args.histogram:
+        histograms = Histograms()
+        listeners.append(histograms)
+    if args.format == NDJSON_FORMAT:
+        listeners.append(NdjsonWriter())
+    if args.progress:
+        listeners.append(ProgressReporter())
+
     code_size_counter = CodeSizeCounter(
-        args.directory, file_extensions, args.log, excluded_items
+        args.directory,
+        file_extensions,
+        args.log,
+        excluded_items,
+        workers=args.jobs,
+        io_threads=args.io_threads,
+        fast_line_count=args.fast_line_count,
+        mmap_threshold=mmap_threshold,
+        excluded_patterns=tuple(args.exclude_pattern),
+        respect_gitignore=args.respect_gitignore,
+        source=args.source,
+        cache_path=args.cache,
+        listeners=tuple(listeners),
+        metrics=METRICS_TO_PRINT.get(args.print, ALL_METRICS),
+        ignore_extension_case=args.ignore_extension_case,
     )
 
-    file_sizes = code_size_counter.calculate_size()
+    if args.watch:
+        try:
+            code_size_counter.watch(
+                lambda file_sizes: print_results(file_sizes, args.print, args.format)
+            )
+        except KeyboardInterrupt:
+            pass
+    elif args.format == NDJSON_FORMAT:
+        code_size_counter.calculate_size()
+    else:
+        file_sizes = code_size_counter.calculate_size()
+        print_results(
+            file_sizes,
+            args.print,
+            args.format,
+            get_other_results(directory_rollup, largest_items),
+            histograms,
+        )
+
+
+def get_other_results(directory_rollup, largest_items):
+    """
+    get the results printed besides the results per extension
+
+    :param directory_rollup: DirectoryRollup with the results per directory (None = don't print them)
+    :param largest_items: LargestItems with the largest files and directories (None = don't print them)
+    :return: list of (name, name of the first column, list of (key, FileSetSize) tuples) tuples
+    """
+    other_results = []
+    if directory_rollup is not None:
+        other_results.append(
+            ("directories", "directory", sorted(directory_rollup.results.items()))
+        )
+    if largest_items is not None:
+        other_results += [
+            ("largest_files_by_lines", "file", largest_items.get_files_by_lines()),
+            ("largest_files_by_size", "file", largest_items.get_files_by_size()),
+            (
+                "largest_directories_by_lines",
+                "directory",
+                largest_items.get_directories_by_lines(),
+            ),
+            (
+                "largest_directories_by_size",
+                "directory",
+                largest_items.get_directories_by_size(),
+            ),
+        ]
+    return other_results
+
+
+def print_results(
+    file_sizes,
+    what_to_print,
+    output_format=TABLE_FORMAT,
+    other_results=(),
+    histograms=None,
+):
+    """
+    print the results - either in the given format or just the selected value
+
+    :param file_sizes: dictionary of FileSetSize objects by file extension
+    :param what_to_print: the selected value to print (None = print all results)
+    :param output_format: format of the results (`TABLE_FORMAT`, `JSON_FORMAT` or `CSV_FORMAT`)
+    :param other_results: results printed after the results per extension (e.g. per directory),
+        see `get_other_results`
+    :param histograms: Histograms with the distributions of lines and sizes per extension
+        (None = don't print them)
+    """
     total_sizes = (
         reduce(lambda x, y: x + y, file_sizes.values())
         if file_sizes
         else FileSetSize.empty()
     )
 
-    what_to_print = args.print
     if what_to_print == "kb_size":
-        print(format_to_kilobytes(total_sizes.total_size))
+        print(format_to_kilobytes(total_sizes.total_size), flush=True)
     elif what_to_print == "lines":
-        print(total_sizes.total_lines)
+        print(total_sizes.total_lines, flush=True)
     elif what_to_print == "files":
-        print(total_sizes.total_files)
+        print(total_sizes.total_files, flush=True)
+    elif output_format == JSON_FORMAT:
+        print_json_results(file_sizes, total_sizes, other_results, histograms)
+    elif output_format == CSV_FORMAT:
+        print_csv_results(file_sizes, other_results, histograms)
     else:
-        # create results table
-        results_table = PrettyTable()
-        results_table.field_names = [
-            "Extension",
-            "Total files",
-            "Total lines",
-            "Total size (KB)",
-        ]
-        results_table.vrules = FRAME
-
-        for fn in results_table.field_names:
-            results_table.align[fn] = "r"
+        results_table = create_results_table("Extension")
 
         # sort by file extension
         file_sizes = dict(sorted(file_sizes.items()))
@@ -141,7 +406,250 @@ def main():
             )
 
         # print the table
-        print(results_table)
+        print(results_table, flush=True)
+
+        for name, first_column_name, items in other_results:
+            print_other_results_table(name, first_column_name, items)
+
+        if histograms is not None:
+            print_histogram_tables(histograms)
+
+
+def print_json_results(file_sizes, total_sizes, other_results, histograms):
+    """
+    print the results as a JSON object
+
+    :param file_sizes: dictionary of FileSetSize objects by file extension
+    :param total_sizes: FileSetSize of all files
+    :param other_results: results printed after the results per extension, see `get_other_results`
+    :param histograms: Histograms with the distributions per extension (None = don't print them)
+    """
+    results = {
+        "extensions": {
+            ext: size_to_dict(size) for ext, size in sorted(file_sizes.items())
+        },
+        "total": size_to_dict(total_sizes),
+    }
+    for name, _, items in other_results:
+        results[name] = {key: size_to_dict(size) for key, size in items}
+    if histograms is not None:
+        results["histograms"] = {
+            ext: {
+                metric: distribution_to_dict(distribution)
+                for metric, distribution in get_distributions(histograms, ext)
+            }
+            for ext in sorted(histograms.lines)
+        }
+    print(json.dumps(results, indent=2), flush=True)
+
+
+def print_csv_results(file_sizes, other_results, histograms):
+    """
+    print the results as CSV, the other results and histograms (if any) are printed as further tables
+    separated by an empty line
+
+    :param file_sizes: dictionary of FileSetSize objects by file extension
+    :param other_results: results printed after the results per extension, see `get_other_results`
+    :param histograms: Histograms with the distributions per extension (None = don't print them)
+    """
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    tables = [("extension", sorted(file_sizes.items()))]
+    tables += [
+        (first_column_name, items) for _, first_column_name, items in other_results
+    ]
+
+    for i, (first_column_name, items) in enumerate(tables):
+        if i > 0:
+            writer.writerow([])
+        writer.writerow([first_column_name, "files", "lines", "bytes"])
+        for key, size in items:
+            writer.writerow([key, size.total_files, size.total_lines, size.total_size])
+
+    if histograms is not None:
+        writer.writerow([])
+        writer.writerow(
+            ["extension", "metric"] + get_quantile_names(REPORTED_QUANTILES) + ["max"]
+        )
+        for ext in sorted(histograms.lines):
+            for metric, distribution in get_distributions(histograms, ext):
+                writer.writerow(
+                    [ext, metric]
+                    + distribution.get_quantiles()
+                    + [distribution.sketch.max]
+                )
+
+        writer.writerow([])
+        writer.writerow(["extension", "metric", "min", "max", "files"])
+        for ext in sorted(histograms.lines):
+            for metric, distribution in get_distributions(histograms, ext):
+                for lower_bound, upper_bound, count in distribution.get_buckets():
+                    writer.writerow([ext, metric, lower_bound, upper_bound, count])
+    sys.stdout.flush()
+
+
+def size_to_dict(file_set_size):
+    """
+    convert the FileSetSize object to a dictionary (with the size in bytes)
+    """
+    return {
+        "files": file_set_size.total_files,
+        "lines": file_set_size.total_lines,
+        "bytes": file_set_size.total_size,
+    }
+
+
+def get_distributions(histograms, ext):
+    """
+    get the distributions of the files with the given extension
+
+    :return: list of (metric name, Distribution) tuples
+    """
+    return [("lines", histograms.lines[ext]), ("bytes", histograms.sizes[ext])]
+
+
+def get_quantile_names(quantiles):
+    """
+    get names of the quantiles (e.g. 'p50' for 0.5)
+    """
+    return [f"p{round(q * 100)}" for q in quantiles]
+
+
+def distribution_to_dict(distribution):
+    """
+    convert the Distribution object to a dictionary with the quantiles, maximum and histogram buckets
+    """
+    result = dict(
+        zip(get_quantile_names(REPORTED_QUANTILES), distribution.get_quantiles())
+    )
+    result["max"] = distribution.sketch.max
+    result["buckets"] = [
+        {"min": lower_bound, "max": upper_bound, "files": count}
+        for lower_bound, upper_bound, count in distribution.get_buckets()
+    ]
+    return result
+
+
+def print_histogram_tables(histograms):
+    """
+    print the table of the percentiles per extension and the histogram of each extension
+
+    :param histograms: Histograms with the distributions of lines and sizes per extension
+    """
+    from prettytable import FRAME, PrettyTable
+
+    quantile_names = get_quantile_names(REPORTED_QUANTILES) + ["max"]
+    percentiles_table = PrettyTable()
+    percentiles_table.title = "Percentiles"
+    percentiles_table.field_names = (
+        ["Extension"]
+        + [f"Lines {name}" for name in quantile_names]
+        + [f"Size {name} (KB)" for name in quantile_names]
+    )
+    percentiles_table.vrules = FRAME
+    for fn in percentiles_table.field_names:
+        percentiles_table.align[fn] = "r"
+
+    for ext in sorted(histograms.lines):
+        lines = histograms.lines[ext]
+        sizes = histograms.sizes[ext]
+        percentiles_table.add_row(
+            [format_extension(ext)]
+            + lines.get_quantiles()
+            + [lines.sketch.max]
+            + [
+                format_to_kilobytes(value)
+                for value in sizes.get_quantiles() + [sizes.sketch.max]
+            ]
+        )
+    print(percentiles_table, flush=True)
+
+    for ext in sorted(histograms.lines):
+        # number of the files in the buckets by their lower bound
+        counts = {}
+        for column, distribution in enumerate(
+            [histograms.lines[ext], histograms.sizes[ext]]
+        ):
+            for lower_bound, upper_bound, count in distribution.get_buckets():
+                counts.setdefault((lower_bound, upper_bound), [0, 0])[column] = count
+
+        histogram_table = PrettyTable()
+        histogram_table.title = f"Histogram of {format_extension(ext)} files"
+        histogram_table.field_names = ["Range", "Files by lines", "Files by size (B)"]
+        histogram_table.vrules = FRAME
+        for fn in histogram_table.field_names:
+            histogram_table.align[fn] = "r"
+
+        for (lower_bound, upper_bound), (lines_count, sizes_count) in sorted(
+            counts.items()
+        ):
+            histogram_table.add_row(
+                [
+                    format_range(lower_bound, upper_bound),
+                    lines_count,
+                    sizes_count,
+                ]
+            )
+        print(histogram_table, flush=True)
+
+
+def format_range(lower_bound, upper_bound):
+    """
+    format range of the histogram bucket (with inclusive bounds, None = unbounded)
+    """
+    if upper_bound is None:
+        return f"{lower_bound}+"
+    if lower_bound == upper_bound:
+        return str(lower_bound)
+    return f"{lower_bound}-{upper_bound}"
+
+
+def print_other_results_table(name, first_column_name, items):
+    """
+    print the table of other results than the results per extension (e.g. per directory)
+
+    :param name: name of the results (e.g. 'largest_files_by_lines'), it's used as the title of the table
+    :param first_column_name: name of the first column (what the results are grouped by)
+    :param items: list of (key, FileSetSize) tuples in the order they should be printed
+    """
+    first_column_title = first_column_name.capitalize()
+    results_table = create_results_table(first_column_title)
+    results_table.title = name.replace("_", " ").capitalize()
+    results_table.align[first_column_title] = "l"
+
+    for key, size in items:
+        results_table.add_row(
+            [
+                key,
+                size.total_files,
+                size.total_lines,
+                format_to_kilobytes(size.total_size),
+            ]
+        )
+
+    print(results_table, flush=True)
+
+
+def create_results_table(first_column_name):
+    """
+    create empty table of the results
+
+    :param first_column_name: name of the first column (what the results are grouped by)
+    """
+    # imported here, so that the other output formats don't pay for importing it
+    from prettytable import FRAME, PrettyTable
+
+    results_table = PrettyTable()
+    results_table.field_names = [
+        first_column_name,
+        "Total files",
+        "Total lines",
+        "Total size (KB)",
+    ]
+    results_table.vrules = FRAME
+
+    for fn in results_table.field_names:
+        results_table.align[fn] = "r"
+    return results_table
 
 
 if __name__ == "__main__":
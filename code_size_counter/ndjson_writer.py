@@ -0,0 +1,41 @@
+import json
+import sys
+
+from code_size_counter.buffered_writer import DEFAULT_BUFFER_SIZE, BufferedTextWriter
+from code_size_counter.listeners import FileListener
+
+
+class NdjsonWriter(FileListener):
+    """
+    listener writing the counted files to the output as they're counted, one JSON object per line (NDJSON)
+
+    The records are collected in a buffer and written (and flushed) in large blocks,
+    so the output can be consumed while the files are still being counted.
+    """
+
+    def __init__(self, stream=None, buffer_size=DEFAULT_BUFFER_SIZE):
+        """
+        :param stream: text stream to write the records to (None = standard output)
+        :param buffer_size: number of characters collected before they're written to the stream
+        """
+        self._writer = BufferedTextWriter(
+            sys.stdout if stream is None else stream, buffer_size
+        )
+
+    def file_counted(self, file_record):
+        record = {
+            "path": file_record.path,
+            "extension": file_record.extension,
+            "lines": file_record.lines,
+            "bytes": file_record.size,
+        }
+        self._writer.write(json.dumps(record) + "\n")
+
+    def finished(self):
+        self._writer.flush()
+
+    def flush(self):
+        """
+        write the buffered records to the stream
+        """
+        self._writer.flush()
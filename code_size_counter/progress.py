@@ -0,0 +1,123 @@
+import os
+import shutil
+import sys
+import time
+
+from code_size_counter.buffered_writer import BufferedTextWriter
+from code_size_counter.file_tools import get_path_with_slashes
+from code_size_counter.listeners import FileListener
+
+# number of characters of the log collected before they're written to the output
+LOG_BUFFER_SIZE = 1024 * 1024
+
+# minimal interval (in seconds) between two reports of the progress, i.e. the progress is refreshed at 10 Hz
+DEFAULT_REFRESH_INTERVAL = 0.1
+
+# minimal interval (in seconds) between two reports if the output isn't a terminal (e.g. CI logs),
+# where each report is written as a separate line
+NON_TERMINAL_REFRESH_INTERVAL = 10.0
+
+
+class FileLog(FileListener):
+    """
+    listener writing a line about each processed file (e.g. 'file XXX processed')
+
+    The lines are written through a large buffer, so that the output isn't flushed after each file.
+    """
+
+    def __init__(self, stream=None, buffer_size=LOG_BUFFER_SIZE):
+        """
+        :param stream: text stream to write the log to (None = standard output)
+        :param buffer_size: number of characters collected before they're written to the stream
+        """
+        self._writer = BufferedTextWriter(
+            sys.stdout if stream is None else stream, buffer_size
+        )
+
+    def file_counted(self, file_record):
+        self._writer.write(f"{get_path_with_slashes(file_record.path)} processed\n")
+
+    def file_skipped(self, file_path):
+        self._writer.write(
+            f"Skipping {get_path_with_slashes(file_path)} , which can't be opened in read mode\n"
+        )
+
+    def finished(self):
+        self._writer.flush()
+
+
+class ProgressReporter(FileListener):
+    """
+    listener reporting the progress of the counting - number of the processed files and bytes, processing speed
+    and the current directory
+
+    The events are just aggregated, the report is printed (to a single, rewritten line) at most once
+    in the refresh interval. If the output isn't a terminal, the reports are printed as separate lines
+    at most once in `NON_TERMINAL_REFRESH_INTERVAL`.
+    """
+
+    def __init__(self, stream=None, refresh_interval=DEFAULT_REFRESH_INTERVAL):
+        """
+        :param stream: text stream to write the progress to (None = standard error output)
+        :param refresh_interval: minimal interval (in seconds) between two reports, if the stream is a terminal
+        """
+        self._stream = sys.stderr if stream is None else stream
+        self._is_terminal = self._stream.isatty()
+        if not self._is_terminal:
+            refresh_interval = max(refresh_interval, NON_TERMINAL_REFRESH_INTERVAL)
+        self._refresh_interval = refresh_interval
+        self._processed_files = 0
+        self._processed_bytes = 0
+        self._last_path = None
+        self._start_time = time.monotonic()
+        self._next_report_time = self._start_time + refresh_interval
+
+    def file_counted(self, file_record):
+        self._processed_bytes += file_record.size
+        self._file_processed(file_record.path)
+
+    def file_skipped(self, file_path):
+        self._file_processed(file_path)
+
+    def finished(self):
+        self._report()
+        if self._is_terminal:
+            self._stream.write("\n")
+        self._stream.flush()
+
+    def _file_processed(self, file_path):
+        """
+        add the file to the progress and report it if the refresh interval elapsed
+        """
+        self._processed_files += 1
+        self._last_path = file_path
+
+        now = time.monotonic()
+        if now >= self._next_report_time:
+            self._next_report_time = now + self._refresh_interval
+            self._report(now)
+
+    def _report(self, now=None):
+        """
+        rewrite the line with the current progress (or write a new line, if the stream isn't a terminal)
+        """
+        if now is None:
+            now = time.monotonic()
+        elapsed = max(now - self._start_time, 1e-9)
+
+        report = (
+            f"{self._processed_files} files ({self._processed_files / elapsed:.0f} files/s), "
+            f"{self._processed_bytes / 1024 / 1024:.1f} MB ({self._processed_bytes / 1024 / 1024 / elapsed:.1f} MB/s)"
+        )
+        if self._last_path is not None:
+            report += f", {get_path_with_slashes(os.path.dirname(self._last_path))}"
+
+        if not self._is_terminal:
+            self._stream.write(report + "\n")
+            self._stream.flush()
+            return
+
+        # the line has to fit the terminal, otherwise it can't be rewritten
+        width = shutil.get_terminal_size().columns - 1
+        self._stream.write(f"\r{report[:width]:<{width}}")
+        self._stream.flush()
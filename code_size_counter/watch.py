@@ -0,0 +1,214 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+
+# default interval (in seconds) between two scans of the polling watcher
+DEFAULT_POLL_INTERVAL = 2.0
+
+# time (in seconds) to wait for further events after the first one, so that related changes are reported together
+EVENTS_DELAY = 0.2
+
+# inotify constants, see `man 7 inotify`
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+
+WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+# events that change the directory structure (i.e. the set of files)
+STRUCTURE_EVENTS_MASK = (
+    IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_Q_OVERFLOW
+)
+
+# header of `struct inotify_event` (wd, mask, cookie, len), followed by the name
+EVENT_HEADER = struct.Struct("iIII")
+READ_BUFFER_SIZE = 64 * 1024
+
+
+class Changes:
+    """
+    class representing changes of the files in the watched directories
+    """
+
+    def __init__(self, modified_files, structure_changed):
+        """
+        :param modified_files: set of paths to the files whose content was modified
+        :param structure_changed: were any files or directories added, removed or moved?
+            (in such case, the whole directory tree has to be scanned again)
+        """
+        self.modified_files = modified_files
+        self.structure_changed = structure_changed
+
+
+class InotifyWatcher:
+    """
+    class watching directories for changes using inotify (Linux only)
+
+    If some directories can't be watched (e.g. the limit of inotify watches was reached), the watcher falls back
+    to reporting that the whole directory tree has to be scanned again after each poll interval without events.
+    """
+
+    def __init__(self, poll_interval=DEFAULT_POLL_INTERVAL):
+        """
+        :param poll_interval: interval (in seconds) between two scans, if some directories can't be watched
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._inotify_add_watch = libc.inotify_add_watch
+        self._inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+
+        self._fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+
+        # paths of the watched directories by their watch descriptors
+        self._directories = {}
+        self._poll_interval = poll_interval
+        # were there directories that couldn't be watched?
+        self._incomplete = False
+
+    def add_directory(self, directory):
+        """
+        start watching the directory (if it isn't watched yet), its subdirectories aren't watched
+        """
+        wd = self._inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self._directories[wd] = directory
+        elif ctypes.get_errno() not in (errno.ENOENT, errno.ENOTDIR):
+            # directories removed in the meantime are reported by their parents, but other errors
+            # (e.g. ENOSPC if the limit of watches was reached) mean that the changes wouldn't be seen
+            self._incomplete = True
+
+    def wait_for_changes(self):
+        """
+        wait until some files in the watched directories change
+
+        :return: Changes object
+        """
+        changes = Changes(set(), False)
+        if not self._read_events(
+            changes, self._poll_interval if self._incomplete else None
+        ):
+            # some directories aren't watched, so the tree is scanned periodically
+            changes.structure_changed = True
+            return changes
+        # collect the events that follow shortly after the first one
+        while self._read_events(changes, EVENTS_DELAY):
+            pass
+        return changes
+
+    def close(self):
+        os.close(self._fd)
+
+    def _read_events(self, changes, timeout):
+        """
+        read the available events and add them to the changes
+
+        :param changes: Changes object to update
+        :param timeout: maximum time (in seconds) to wait for the events (None = wait indefinitely)
+        :return: were any events read?
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return False
+
+        buffer = os.read(self._fd, READ_BUFFER_SIZE)
+        offset = 0
+        while offset < len(buffer):
+            wd, mask, _, name_length = EVENT_HEADER.unpack_from(buffer, offset)
+            name_start = offset + EVENT_HEADER.size
+            offset = name_start + name_length
+            name = os.fsdecode(buffer[name_start:offset].rstrip(b"\0"))
+
+            if mask & IN_IGNORED:
+                self._directories.pop(wd, None)
+            if mask & STRUCTURE_EVENTS_MASK:
+                changes.structure_changed = True
+            elif mask & IN_CLOSE_WRITE and wd in self._directories:
+                changes.modified_files.add(os.path.join(self._directories[wd], name))
+        return True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class PollingWatcher:
+    """
+    class "watching" directories by periodically reporting that the whole directory tree has to be scanned again
+
+    It's used on systems without inotify, a scan reads just the metadata of the files (and the modified files).
+    """
+
+    def __init__(self, poll_interval=DEFAULT_POLL_INTERVAL):
+        """
+        :param poll_interval: interval (in seconds) between two scans
+        """
+        self._poll_interval = poll_interval
+
+    def add_directory(self, directory):
+        pass
+
+    def wait_for_changes(self):
+        """
+        wait for the poll interval
+
+        :return: Changes object
+        """
+        time.sleep(self._poll_interval)
+        return Changes(set(), True)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def create_watcher(poll_interval=DEFAULT_POLL_INTERVAL):
+    """
+    create watcher of directories - inotify watcher on Linux, polling watcher on other systems
+
+    :param poll_interval: interval (in seconds) between two scans of the polling watcher
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(poll_interval)
+        except (OSError, AttributeError):  # inotify isn't available
+            pass
+    return PollingWatcher(poll_interval)
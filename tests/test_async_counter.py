@@ -0,0 +1,108 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from code_size_counter.async_counter import AsyncCodeSizeCounter
+from code_size_counter.code_size_counter import CodeSizeCounter
+from code_size_counter.file_tools import FileManager
+
+
+class TestAsyncCodeSizeCounter(unittest.TestCase):
+    """
+    class containing tests for AsyncCodeSizeCounter class
+    """
+
+    def test_calculate_size_concurrently(self):
+        """
+        multiple directories counted concurrently give the same results as the synchronous counter
+        """
+        directories = [
+            os.path.join(_get_tests_dir(), "simple-test-dir"),
+            os.path.join(_get_tests_dir(), "complex-test-dir"),
+        ]
+
+        async def calculate_sizes():
+            limiter = asyncio.Semaphore(1)
+            counters = [
+                AsyncCodeSizeCounter(
+                    directory, (), False, (), limiter=limiter, batch_size=4
+                )
+                for directory in directories
+            ]
+            return await asyncio.gather(
+                *(counter.calculate_size() for counter in counters)
+            )
+
+        code_sizes = asyncio.run(calculate_sizes())
+
+        for directory, code_size in zip(directories, code_sizes):
+            expected_result = CodeSizeCounter(directory, (), False, ()).calculate_size()
+            self.assertDictEqual(expected_result, code_size)
+
+    def test_iter_files_stop_early(self):
+        """
+        the counting can be stopped before all files are counted
+        """
+        directory = os.path.join(_get_tests_dir(), "complex-test-dir")
+
+        async def get_first_files():
+            file_records = AsyncCodeSizeCounter(
+                directory, (), False, (), batch_size=2, io_threads=2
+            ).iter_files()
+            first_records = [await file_records.__anext__() for _ in range(3)]
+            await file_records.aclose()
+            return first_records
+
+        first_records = asyncio.run(get_first_files())
+
+        self.assertEqual(3, len(first_records))
+
+    def test_cancel_iteration(self):
+        """
+        cancelling the task that iterates the files raises CancelledError, even if a batch is being counted
+        """
+
+        def count_lines_slowly(file_manager):
+            time.sleep(0.005)
+            return 1
+
+        async def cancel_iteration(directory):
+            async def iterate():
+                async for _ in AsyncCodeSizeCounter(
+                    directory, ("py",), False, (), batch_size=50
+                ).iter_files():
+                    pass
+
+            task = asyncio.create_task(iterate())
+            await asyncio.sleep(0.02)
+            task.cancel()
+            await task
+
+        with tempfile.TemporaryDirectory() as root_dir:
+            for i in range(100):
+                with open(os.path.join(root_dir, f"{i}.py"), "w") as file:
+                    file.write("x\n")
+
+            with mock.patch.object(
+                FileManager,
+                "get_lines_count",
+                autospec=True,
+                side_effect=count_lines_slowly,
+            ):
+                with self.assertRaises(asyncio.CancelledError):
+                    asyncio.run(cancel_iteration(root_dir))
+
+
+def _get_tests_dir():
+    """
+    get path to /tests directory
+    """
+    return Path(__file__).parent.absolute()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,181 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from code_size_counter.cache import LinesCountCache
+from code_size_counter.code_size_counter import CodeSizeCounter, _count_batch
+from code_size_counter.file_tools import FileManager, FileSetSize
+
+
+class TestLinesCountCache(unittest.TestCase):
+    """
+    class containing tests for caching the results of CodeSizeCounter
+    """
+
+    def test_unmodified_files_are_not_read(self):
+        """
+        unmodified files are taken from the cache, modified ones are counted again
+        """
+        with tempfile.TemporaryDirectory() as root_dir:
+            directory = os.path.join(root_dir, "src")
+            shutil.copytree(
+                os.path.join(_get_tests_dir(), "simple-test-dir"), directory
+            )
+            cache_path = os.path.join(root_dir, "cache", "cache.sqlite3")
+
+            code_size = _calculate_size(directory, cache_path)
+            self.assertDictEqual({"txt": FileSetSize(3, 35, 2374)}, code_size)
+
+            with mock.patch.object(
+                FileManager, "get_lines_count", side_effect=AssertionError
+            ):
+                code_size = _calculate_size(directory, cache_path)
+            self.assertDictEqual({"txt": FileSetSize(3, 35, 2374)}, code_size)
+
+            with open(os.path.join(directory, "a.txt"), "a") as file:
+                file.write("\nnew line")
+
+            code_size = _calculate_size(directory, cache_path)
+            self.assertDictEqual({"txt": FileSetSize(3, 36, 2383)}, code_size)
+
+    def test_unchanged_directories_are_taken_from_cache(self):
+        """
+        aggregated results of unchanged directories are taken from the cache without looking up single files
+        """
+        with tempfile.TemporaryDirectory() as root_dir:
+            directory = os.path.join(root_dir, "src")
+            shutil.copytree(
+                os.path.join(_get_tests_dir(), "simple-test-dir"), directory
+            )
+            cache_path = os.path.join(root_dir, "cache.sqlite3")
+            _calculate_size(directory, cache_path)
+
+            with mock.patch.object(
+                LinesCountCache, "get", side_effect=AssertionError
+            ), mock.patch.object(
+                FileManager, "get_lines_count", side_effect=AssertionError
+            ):
+                code_size = _calculate_size(directory, cache_path)
+            self.assertDictEqual({"txt": FileSetSize(3, 35, 2374)}, code_size)
+
+            os.remove(os.path.join(directory, "dir", "c.txt"))
+
+            code_size = _calculate_size(directory, cache_path)
+            self.assertDictEqual({"txt": FileSetSize(2, 14, 1370)}, code_size)
+
+    def test_directory_cache_with_different_extensions(self):
+        """
+        cached directories aren't reused if the files are matched to different extensions
+        """
+        with tempfile.TemporaryDirectory() as root_dir:
+            directory = os.path.join(root_dir, "src")
+            os.mkdir(directory)
+            for name, content in (("x.d.ts", "x\nx\n"), ("y.ts", "x\n")):
+                with open(os.path.join(directory, name), "w") as file:
+                    file.write(content)
+            cache_path = os.path.join(root_dir, "cache.sqlite3")
+
+            for extensions, expected_result in (
+                (
+                    ("ts", "d.ts"),
+                    {"ts": FileSetSize(1, 1, 2), "d.ts": FileSetSize(1, 2, 4)},
+                ),
+                (("ts",), {"ts": FileSetSize(2, 3, 6)}),
+                (("TS",), {}),
+            ):
+                code_size = CodeSizeCounter(
+                    directory, extensions, False, (), cache_path=cache_path
+                ).calculate_size()
+                self.assertDictEqual(expected_result, code_size)
+
+            code_size = CodeSizeCounter(
+                directory,
+                ("TS",),
+                False,
+                (),
+                cache_path=cache_path,
+                ignore_extension_case=True,
+            ).calculate_size()
+            self.assertDictEqual({"TS": FileSetSize(2, 3, 6)}, code_size)
+
+    def test_directory_cache_with_worker_processes(self):
+        """
+        the directories are cached while worker processes store the results of the files in the same cache
+        """
+        with tempfile.TemporaryDirectory() as root_dir:
+            directory = os.path.join(root_dir, "src")
+            for i in range(4):
+                os.makedirs(os.path.join(directory, f"dir{i}"))
+                for j in range(5):
+                    path = os.path.join(directory, f"dir{i}", f"{j}.txt")
+                    with open(path, "w") as file:
+                        file.write("x\n" * j)
+            cache_path = os.path.join(root_dir, "cache.sqlite3")
+
+            # small batches, so that the workers write to the cache while the directories are being cached
+            with mock.patch("code_size_counter.code_size_counter.BATCH_SIZE", 2):
+                for _ in range(2):
+                    code_size = CodeSizeCounter(
+                        directory, ("txt",), False, (), workers=2, cache_path=cache_path
+                    ).calculate_size()
+                    self.assertDictEqual({"txt": FileSetSize(20, 40, 80)}, code_size)
+
+    def test_batch_results_are_stored_at_once(self):
+        """
+        results of a batch counted by a worker process are stored in a single write, after the batch is counted
+        """
+        with tempfile.TemporaryDirectory() as root_dir:
+            cache_path = os.path.join(root_dir, "cache.sqlite3")
+            directory = os.path.join(_get_tests_dir(), "simple-test-dir")
+            file_managers = [
+                FileManager(os.path.join(directory, name))
+                for name in ("a.txt", "b.txt")
+            ]
+
+            with mock.patch.object(
+                LinesCountCache, "set", side_effect=AssertionError
+            ), mock.patch.object(
+                LinesCountCache, "set_many", autospec=True
+            ) as set_many:
+                set_many.side_effect = lambda cache, results: cache.commit()
+                file_sizes = _count_batch(file_managers, LinesCountCache(cache_path))
+
+            self.assertListEqual(
+                [FileSetSize(1, 11, 984), FileSetSize(1, 3, 386)], file_sizes
+            )
+            set_many.assert_called_once()
+            self.assertListEqual(
+                list(zip(file_managers, file_sizes)), set_many.call_args.args[1]
+            )
+
+            cache = LinesCountCache(cache_path)
+            _count_batch(file_managers, cache)
+            with mock.patch.object(
+                FileManager, "get_lines_count", side_effect=AssertionError
+            ):
+                self.assertListEqual(
+                    file_sizes, _count_batch(file_managers, LinesCountCache(cache_path))
+                )
+
+
+def _calculate_size(directory, cache_path):
+    """
+    calculate size of .txt files in the directory, using the given cache
+    """
+    return CodeSizeCounter(
+        directory, ("txt",), False, (), cache_path=cache_path
+    ).calculate_size()
+
+
+def _get_tests_dir():
+    """
+    get path to /tests directory
+    """
+    return Path(__file__).parent.absolute()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,19 @@
 import os
+import shutil
+import subprocess
+import sys
+import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
-from code_size_counter.code_size_counter import CodeSizeCounter
-from code_size_counter.file_tools import FileSetSize
+from code_size_counter.code_size_counter import (
+    FILES_METRIC,
+    GIT_SOURCE,
+    SIZE_METRIC,
+    CodeSizeCounter,
+)
+from code_size_counter.file_tools import FileManager, FileRecord, FileSetSize
 
 
 class TestCodeSizeCounter(unittest.TestCase):
@@ -52,6 +62,68 @@ class TestCodeSizeCounter(unittest.TestCase):
         # self.assertEqual(9842, code_size.total_size)
         # self.assertEqual(309, code_size.total_lines)
 
+    def test_calculate_size_parallel(self):
+        """
+        test case counting the files in worker processes
+        """
+        excluded_items = map(
+            lambda ex: os.path.join(_get_tests_dir(), "complex-test-dir", ex),
+            [os.path.join("src", "module2", "main.py"), "virtualenv"],
+        )
+
+        code_size_counter = CodeSizeCounter(
+            os.path.join(_get_tests_dir(), "complex-test-dir"),
+            ("py", "yml", "md", "txt"),
+            False,
+            tuple(excluded_items),
+            workers=2,
+        )
+        code_size = code_size_counter.calculate_size()
+
+        expected_result = {
+            "py": FileSetSize(11, 270, 8511),
+            "yml": FileSetSize(1, 36, 1187),
+            "md": FileSetSize(1, 3, 144),
+        }
+
+        self.assertDictEqual(expected_result, code_size)
+
+    def test_calculate_size_io_threads(self):
+        """
+        test case reading the files in a pool of I/O threads
+        """
+        code_size_counter = CodeSizeCounter(
+            os.path.join(_get_tests_dir(), "simple-test-dir"),
+            ("txt",),
+            False,
+            (),
+            io_threads=4,
+        )
+        code_size = code_size_counter.calculate_size()
+
+        expected_result = {"txt": FileSetSize(3, 35, 2374)}
+
+        self.assertDictEqual(expected_result, code_size)
+
+    def test_io_threads_stat_files(self):
+        """
+        with I/O threads, the files aren't stat-ed by the walk, but by the threads that count them
+        """
+        code_size_counter = CodeSizeCounter(
+            os.path.join(_get_tests_dir(), "simple-test-dir"),
+            ("txt",),
+            False,
+            (),
+            io_threads=2,
+        )
+        file_managers = list(
+            code_size_counter._find_files(code_size_counter._directory)
+        )
+
+        self.assertEqual(3, len(file_managers))
+        for file_manager in file_managers:
+            self.assertIsNone(file_manager.stat_result)
+
     def test_calculate_size_exclude_directories(self):
         """
         test case with excluding directories
@@ -73,6 +145,263 @@ class TestCodeSizeCounter(unittest.TestCase):
 
         self.assertDictEqual(expected_result, code_size)
 
+    def test_calculate_size_exclude_non_normalized_paths(self):
+        """
+        test case with excluded paths, which aren't normalized
+        """
+        excluded_items = map(
+            lambda ex: os.path.join(_get_tests_dir(), "exclude-test-dir", ex),
+            [os.path.join("dir", "..", "dir", "dir-ex2"), os.path.join(".", "dir-ex")],
+        )
+
+        code_size_counter = CodeSizeCounter(
+            os.path.join(_get_tests_dir(), "exclude-test-dir"),
+            ("py",),
+            False,
+            tuple(excluded_items),
+        )
+        code_size = code_size_counter.calculate_size()
+
+        expected_result = {"py": FileSetSize(2, 4, 104)}
+
+        self.assertDictEqual(expected_result, code_size)
+
+    def test_calculate_size_exclude_patterns(self):
+        """
+        test case with excluding directories & files by patterns
+        """
+        code_size_counter = CodeSizeCounter(
+            os.path.join(_get_tests_dir(), "complex-test-dir"),
+            ("py", "yml", "md", "txt"),
+            False,
+            (),
+            excluded_patterns=("**/module2/main.py", "virtualenv/"),
+        )
+        code_size = code_size_counter.calculate_size()
+
+        expected_result = {
+            "py": FileSetSize(11, 270, 8511),
+            "yml": FileSetSize(1, 36, 1187),
+            "md": FileSetSize(1, 3, 144),
+        }
+
+        self.assertDictEqual(expected_result, code_size)
+
+    def test_calculate_size_respect_gitignore(self):
+        """
+        test case excluding directories & files ignored by .gitignore files
+        """
+        files = {
+            ".gitignore": "build/\n*.log\n",
+            os.path.join(".git", "config.py"): "a = 1\n",
+            os.path.join("build", "main.py"): "a = 1\n",
+            os.path.join("src", ".gitignore"): "generated_*.py\n!*.log\n",
+            os.path.join("src", "main.py"): "a = 1\n",
+            os.path.join("src", "generated_a.py"): "a = 1\n",
+            os.path.join("src", "debug.log"): "message\n",
+            "debug.log": "message\n",
+        }
+
+        with tempfile.TemporaryDirectory() as root_dir:
+            for file_path, content in files.items():
+                file_path = os.path.join(root_dir, file_path)
+                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+                with open(file_path, "w") as file:
+                    file.write(content)
+
+            code_size_counter = CodeSizeCounter(
+                root_dir, ("py", "log"), False, (), respect_gitignore=True
+            )
+            code_size = code_size_counter.calculate_size()
+
+        expected_result = {"py": FileSetSize(1, 1, 6), "log": FileSetSize(1, 1, 8)}
+
+        self.assertDictEqual(expected_result, code_size)
+
+    @unittest.skipIf(shutil.which("git") is None, "git is not installed")
+    def test_calculate_size_git_source(self):
+        """
+        test case counting just the files tracked by git
+        """
+        with tempfile.TemporaryDirectory() as root_dir:
+            shutil.copytree(
+                os.path.join(_get_tests_dir(), "exclude-test-dir"),
+                os.path.join(root_dir, "src"),
+            )
+            with open(os.path.join(root_dir, "src", "untracked.py"), "w") as file:
+                file.write("a = 1\n")
+
+            subprocess.run(["git", "init", "-q"], cwd=root_dir, check=True)
+            subprocess.run(
+                ["git", "add", "src/main.py", "src/dir", "src/dir-ex/main.py"],
+                cwd=root_dir,
+                check=True,
+            )
+
+            code_size_counter = CodeSizeCounter(
+                os.path.join(root_dir, "src"),
+                ("py",),
+                False,
+                (os.path.join(root_dir, "src", "dir", "dir-ex2"),),
+                source=GIT_SOURCE,
+            )
+            code_size = code_size_counter.calculate_size()
+
+        expected_result = {"py": FileSetSize(3, 6, 156)}
+
+        self.assertDictEqual(expected_result, code_size)
+
+    def test_watch(self):
+        """
+        test case updating the results after the files change
+        """
+        results = []
+
+        def on_update(file_sizes):
+            results.append(dict(file_sizes))
+            if len(results) == 1:
+                with open(os.path.join(root_dir, "main.py"), "a") as file:
+                    file.write("c = 3\n")
+            else:
+                raise _StopWatching()
+
+        with tempfile.TemporaryDirectory() as root_dir:
+            with open(os.path.join(root_dir, "main.py"), "w") as file:
+                file.write("a = 1\nb = 2\n")
+
+            code_size_counter = CodeSizeCounter(root_dir, ("py",), False, ())
+            with self.assertRaises(_StopWatching):
+                code_size_counter.watch(on_update, poll_interval=0.1)
+
+        expected_results = [
+            {"py": FileSetSize(1, 2, 12)},
+            {"py": FileSetSize(1, 3, 18)},
+        ]
+
+        self.assertListEqual(expected_results, results)
+
+    def test_watch_files_removed_during_scan(self):
+        """
+        files and directories removed between being listed and being counted don't stop the watch mode
+        """
+        find_files = CodeSizeCounter._find_files
+        scandir = os.scandir
+
+        def on_update(file_sizes):
+            results.append(dict(file_sizes))
+            raise _StopWatching()
+
+        with tempfile.TemporaryDirectory() as root_dir:
+            removed_file = os.path.join(root_dir, "removed.py")
+            removed_dir = os.path.join(root_dir, "removed_dir")
+
+            def find_files_and_remove_file(counter, directory, visited_directories):
+                file_managers = list(
+                    find_files(counter, directory, visited_directories)
+                )
+                os.remove(removed_file)
+                return iter(file_managers)
+
+            def scandir_without_removed_dir(path):
+                if path == removed_dir:
+                    raise FileNotFoundError(path)
+                return scandir(path)
+
+            with open(os.path.join(root_dir, "main.py"), "w") as file:
+                file.write("a = 1\nb = 2\n")
+            os.mkdir(removed_dir)
+            with open(os.path.join(removed_dir, "c.py"), "w") as file:
+                file.write("c = 3\n")
+
+            for options in ({}, {"workers": 2}, {"io_threads": 2}):
+                with open(removed_file, "w") as file:
+                    file.write("d = 4\n")
+
+                results = []
+                with mock.patch.object(
+                    CodeSizeCounter, "_find_files", find_files_and_remove_file
+                ), mock.patch("os.scandir", scandir_without_removed_dir):
+                    code_size_counter = CodeSizeCounter(
+                        root_dir, ("py",), False, (), **options
+                    )
+                    with self.assertRaises(_StopWatching):
+                        code_size_counter.watch(on_update, poll_interval=0.1)
+
+                self.assertListEqual([{"py": FileSetSize(1, 2, 12)}], results)
+
+    def test_iter_files(self):
+        """
+        the generator yields the counted files, also with worker processes and I/O threads
+        """
+        directory = os.path.join(_get_tests_dir(), "simple-test-dir")
+        for options in ({}, {"workers": 2}, {"io_threads": 2}):
+            code_size_counter = CodeSizeCounter(
+                directory, ("txt",), False, (), **options
+            )
+            file_records = sorted(code_size_counter.iter_files())
+
+            self.assertListEqual(
+                [
+                    FileRecord(os.path.join(directory, "a.txt"), "txt", 11, 984),
+                    FileRecord(os.path.join(directory, "b.txt"), "txt", 3, 386),
+                    FileRecord(
+                        os.path.join(directory, "dir", "c.txt"), "txt", 21, 1004
+                    ),
+                ],
+                file_records,
+            )
+
+    def test_iter_files_stop_early(self):
+        """
+        the counting can be stopped before all files are counted
+        """
+        directory = os.path.join(_get_tests_dir(), "complex-test-dir")
+        for options in ({}, {"workers": 2}, {"io_threads": 2}):
+            code_size_counter = CodeSizeCounter(directory, (), False, (), **options)
+            file_records = code_size_counter.iter_files()
+            first_record = next(file_records)
+            file_records.close()
+
+            self.assertTrue(first_record.path.startswith(directory))
+
+    def test_calculate_size_without_file_records(self):
+        """
+        without listeners, the sizes of the files are added to the totals without creating FileRecord objects
+        """
+        with mock.patch(
+            "code_size_counter.code_size_counter.FileRecord", side_effect=AssertionError
+        ):
+            code_size = CodeSizeCounter(
+                os.path.join(_get_tests_dir(), "simple-test-dir"), ("txt",), False, ()
+            ).calculate_size()
+
+        self.assertDictEqual({"txt": FileSetSize(3, 35, 2374)}, code_size)
+
+    def test_calculate_size_selected_metrics(self):
+        """
+        the files aren't read if lines aren't counted, files that can't be decoded are counted as well
+        """
+        with tempfile.TemporaryDirectory() as root_dir:
+            with open(os.path.join(root_dir, "main.py"), "w") as file:
+                file.write("a = 1\nb = 2\n")
+            with open(os.path.join(root_dir, "data.py"), "wb") as file:
+                file.write(b"\xff\xfe\x00")
+
+            with mock.patch.object(
+                FileManager, "get_lines_count", side_effect=AssertionError
+            ):
+                sizes = CodeSizeCounter(
+                    root_dir, ("py",), False, (), metrics=(FILES_METRIC, SIZE_METRIC)
+                ).calculate_size()
+                files = CodeSizeCounter(
+                    root_dir, ("py",), False, (), metrics=(FILES_METRIC,), workers=2
+                ).calculate_size()
+            all_metrics = CodeSizeCounter(root_dir, ("py",), False, ()).calculate_size()
+
+        self.assertDictEqual({"py": FileSetSize(2, 0, 15)}, sizes)
+        self.assertDictEqual({"py": FileSetSize(2, 0, 0)}, files)
+        self.assertDictEqual({"py": FileSetSize(1, 2, 12)}, all_metrics)
+
     def test_calculate_size_no_matching_files(self):
         """
         test case that doesn't find any suitable files
@@ -87,6 +416,34 @@ class TestCodeSizeCounter(unittest.TestCase):
 
         self.assertDictEqual({}, code_size)
 
+    def test_calculate_size_deep_directory_tree(self):
+        """
+        test case with a directory tree deeper than the recursion limit
+        """
+        recursion_limit = sys.getrecursionlimit()
+        with tempfile.TemporaryDirectory() as root_dir:
+            directory = root_dir
+            for _ in range(300):
+                directory = os.path.join(directory, "d")
+                os.mkdir(directory)
+            with open(os.path.join(directory, "main.py"), "w") as file:
+                file.write("a = 1\nb = 2\n")
+
+            code_size_counter = CodeSizeCounter(root_dir, ("py",), False, ())
+            try:
+                sys.setrecursionlimit(200)
+                code_size = code_size_counter.calculate_size()
+            finally:
+                sys.setrecursionlimit(recursion_limit)
+
+        self.assertDictEqual({"py": FileSetSize(1, 2, 12)}, code_size)
+
+
+class _StopWatching(Exception):
+    """
+    exception used for stopping the watch mode in tests
+    """
+
 
 def _get_tests_dir():
     """
@@ -0,0 +1,63 @@
+import os
+import unittest
+from pathlib import Path
+
+from code_size_counter.code_size_counter import CodeSizeCounter
+from code_size_counter.directory_rollup import DirectoryRollup
+from code_size_counter.file_table import FileTable
+from code_size_counter.file_tools import FileRecord, FileSetSize
+
+
+class TestDirectoryRollup(unittest.TestCase):
+    """
+    class containing tests for DirectoryRollup class
+    """
+
+    def test_rollup_during_walk(self):
+        """
+        the totals computed during the walk are the same as the totals computed from all files
+        """
+        directory = os.path.join(_get_tests_dir(), "complex-test-dir")
+        for depth in (None, 0, 2):
+            for workers in (1, 2):
+                rollup = DirectoryRollup(directory, depth)
+                table = FileTable(directory)
+                CodeSizeCounter(
+                    directory,
+                    ("py", "yml", "md"),
+                    False,
+                    (),
+                    workers=workers,
+                    listeners=(rollup, table),
+                ).calculate_size()
+
+                self.assertDictEqual(table.per_directory(depth), rollup.results)
+
+    def test_rollup_files_out_of_order(self):
+        """
+        directories visited more than once are merged
+        """
+        rollup = DirectoryRollup("root")
+        for path in ["root/a/x.py", "root/b/x.py", "root/a/y.py"]:
+            rollup.file_counted(FileRecord(os.path.join(*path.split("/")), "py", 1, 2))
+        rollup.finished()
+
+        self.assertDictEqual(
+            {
+                ".": FileSetSize(3, 3, 6),
+                "a": FileSetSize(2, 2, 4),
+                "b": FileSetSize(1, 1, 2),
+            },
+            rollup.results,
+        )
+
+
+def _get_tests_dir():
+    """
+    get path to /tests directory
+    """
+    return Path(__file__).parent.absolute()
+
+
+if __name__ == "__main__":
+    unittest.main()
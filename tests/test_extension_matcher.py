@@ -0,0 +1,61 @@
+import unittest
+
+from code_size_counter.extension_matcher import ExtensionMatcher
+from code_size_counter.file_tools import NO_EXTENSION_PLACEHOLDER
+
+
+class TestExtensionMatcher(unittest.TestCase):
+    """
+    class containing tests for ExtensionMatcher class
+    """
+
+    def test_single_part_extensions(self):
+        """
+        the extension is the part of the name after the last dot
+        """
+        matcher = ExtensionMatcher(("py", "md"))
+
+        self.assertEqual("py", matcher.match("main.py"))
+        self.assertEqual("md", matcher.match("README.old.md"))
+        self.assertEqual("py", matcher.match(".py"))
+        self.assertIsNone(matcher.match("main.pyc"))
+        self.assertIsNone(matcher.match("py"))
+        self.assertIsNone(matcher.match("main.PY"))
+
+    def test_multi_part_extensions(self):
+        """
+        the longest matching extension is returned
+        """
+        matcher = ExtensionMatcher(("ts", "d.ts", "tar.gz"))
+
+        self.assertEqual("d.ts", matcher.match("index.d.ts"))
+        self.assertEqual("ts", matcher.match("index.ts"))
+        self.assertEqual("ts", matcher.match("index.e.ts"))
+        self.assertEqual("tar.gz", matcher.match("archive.v1.tar.gz"))
+        self.assertIsNone(matcher.match("archive.gz"))
+        self.assertIsNone(matcher.match("tar.gz"))
+
+    def test_ignore_case(self):
+        """
+        the extension is returned as it was given
+        """
+        matcher = ExtensionMatcher(("py", "D.ts"), ignore_case=True)
+
+        self.assertEqual("py", matcher.match("main.PY"))
+        self.assertEqual("D.ts", matcher.match("index.d.TS"))
+
+    def test_all_files(self):
+        """
+        empty collection of extensions matches all files
+        """
+        matcher = ExtensionMatcher(())
+
+        self.assertEqual("ts", matcher.match("index.d.ts"))
+        self.assertEqual("PY", matcher.match("main.PY"))
+        self.assertEqual("bashrc", matcher.match(".bashrc"))
+        self.assertEqual(NO_EXTENSION_PLACEHOLDER, matcher.match("Makefile"))
+        self.assertEqual("py", ExtensionMatcher((), ignore_case=True).match("main.PY"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from code_size_counter import file_table
+from code_size_counter.code_size_counter import CodeSizeCounter
+from code_size_counter.file_table import SIZE_COLUMN, FileTable
+from code_size_counter.file_tools import FileRecord, FileSetSize
+
+
+class TestFileTable(unittest.TestCase):
+    """
+    class containing tests for FileTable class
+    """
+
+    def test_per_extension(self):
+        """
+        aggregating the table by extension gives the same results as the counter
+        """
+        directory = os.path.join(_get_tests_dir(), "complex-test-dir")
+        table = FileTable(directory)
+        code_size_counter = CodeSizeCounter(
+            directory, ("py", "yml", "md"), False, (), listeners=(table,)
+        )
+        code_size = code_size_counter.calculate_size()
+
+        self.assertEqual(
+            sum(size.total_files for size in code_size.values()), len(table)
+        )
+        self.assertDictEqual(code_size, table.per_extension())
+        with mock.patch.object(file_table, "numpy", None):
+            self.assertDictEqual(code_size, table.per_extension())
+
+    def test_per_directory_and_top_files(self):
+        """
+        the files are aggregated by directory up to the given depth, the largest files are sorted
+        """
+        with tempfile.TemporaryDirectory() as root_dir:
+            os.makedirs(os.path.join(root_dir, "a", "b"))
+            os.mkdir(os.path.join(root_dir, "c"))
+            files = {
+                "main.py": "x\n",
+                os.path.join("a", "a.py"): "x\n" * 3,
+                os.path.join("a", "b", "b.py"): "xxxxxxxxxx\n" * 2,
+                os.path.join("c", "c.py"): "x\n" * 4,
+            }
+            for path, content in files.items():
+                with open(os.path.join(root_dir, path), "w") as file:
+                    file.write(content)
+
+            table = FileTable(root_dir)
+            CodeSizeCounter(
+                root_dir, ("py",), False, (), listeners=(table,)
+            ).calculate_size()
+
+            for numpy_module in (file_table.numpy, None):
+                with mock.patch.object(file_table, "numpy", numpy_module):
+                    self.assertDictEqual(
+                        {
+                            ".": FileSetSize(4, 10, 38),
+                            "a": FileSetSize(2, 5, 28),
+                            os.path.join("a", "b"): FileSetSize(1, 2, 22),
+                            "c": FileSetSize(1, 4, 8),
+                        },
+                        table.per_directory(),
+                    )
+                    self.assertDictEqual(
+                        {
+                            ".": FileSetSize(4, 10, 38),
+                            "a": FileSetSize(2, 5, 28),
+                            "c": FileSetSize(1, 4, 8),
+                        },
+                        table.per_directory(1),
+                    )
+                    self.assertListEqual(
+                        [
+                            FileRecord(os.path.join(root_dir, "c", "c.py"), "py", 4, 8),
+                            FileRecord(os.path.join(root_dir, "a", "a.py"), "py", 3, 6),
+                        ],
+                        table.top_files(2),
+                    )
+                    self.assertListEqual(
+                        [
+                            FileRecord(
+                                os.path.join(root_dir, "a", "b", "b.py"), "py", 2, 22
+                            )
+                        ],
+                        table.top_files(1, SIZE_COLUMN),
+                    )
+
+
+def _get_tests_dir():
+    """
+    get path to /tests directory
+    """
+    return Path(__file__).parent.absolute()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from code_size_counter.file_tools import FileManager, FileSetSize
+
+
+class TestFileSetSize(unittest.TestCase):
+    """
+    class containing tests for FileSetSize class
+    """
+
+    def test_add_in_place(self):
+        """
+        adding in place modifies the object instead of creating a new one
+        """
+        total_size = FileSetSize(1, 10, 100)
+        original_total_size = total_size
+
+        total_size += FileSetSize(2, 20, 200)
+
+        self.assertIs(original_total_size, total_size)
+        self.assertEqual(FileSetSize(3, 30, 300), total_size)
+        self.assertFalse(hasattr(total_size, "__dict__"))
+
+
+class TestFileManager(unittest.TestCase):
+    """
+    class containing tests for FileManager class
+    """
+
+    def test_fast_line_count(self):
+        """
+        counting lines in binary mode gives the same results as in text mode
+        """
+        contents = ["", "\n", "a", "a\n", "a\nb", "a\nb\n", "a\r\nb\r\n\r\nc"]
+
+        with tempfile.TemporaryDirectory() as directory:
+            for i, content in enumerate(contents):
+                file_path = os.path.join(directory, f"{i}.txt")
+                with open(file_path, "w", newline="") as file:
+                    file.write(content)
+
+                with self.subTest(content=content):
+                    self.assertEqual(
+                        FileManager(file_path).get_lines_count(),
+                        FileManager(file_path, fast_line_count=True).get_lines_count(),
+                    )
+
+    def test_mmap_line_count(self):
+        """
+        counting lines in memory-mapped files gives the same results as in text mode
+        """
+        contents = ["", "a", "a\n", "a\nb", "a\r\nb\r\n\r\nc", "x\n" * 1024 * 1024]
+
+        with tempfile.TemporaryDirectory() as directory:
+            for i, content in enumerate(contents):
+                file_path = os.path.join(directory, f"{i}.txt")
+                with open(file_path, "w", newline="") as file:
+                    file.write(content)
+
+                with self.subTest(file=file_path):
+                    self.assertEqual(
+                        FileManager(file_path).get_lines_count(),
+                        FileManager(file_path, mmap_threshold=0).get_lines_count(),
+                    )
+
+    def test_binary_files(self):
+        """
+        binary files are detected by their first bytes in all line counting modes
+        """
+        contents = {
+            "nul.bin": b"text\n\0text\n",
+            "image.png": b"\x89PNG\r\n\x1a\nIHDR\n",
+            "archive.gz": b"\x1f\x8b\x08text\n",
+            "text.txt": b"text\n" * 3000,
+            "riff.txt": b"RIFF is a format\n" + b"text\n" * 2999,
+        }
+
+        with tempfile.TemporaryDirectory() as directory:
+            for name, content in contents.items():
+                file_path = os.path.join(directory, name)
+                with open(file_path, "wb") as file:
+                    file.write(content)
+
+                expected_lines_count = 3000 if name.endswith(".txt") else None
+                for options in ({}, {"fast_line_count": True}, {"mmap_threshold": 0}):
+                    with self.subTest(file=name, options=options):
+                        file_manager = FileManager(file_path, **options)
+                        self.assertEqual(
+                            expected_lines_count, file_manager.get_lines_count()
+                        )
+                        self.assertEqual(
+                            expected_lines_count is None, file_manager.binary
+                        )
+
+    def test_fast_line_count_test_dir(self):
+        """
+        counting lines of the files in simple test directory in binary mode
+        """
+        directory = os.path.join(_get_tests_dir(), "simple-test-dir")
+        lines_count = sum(
+            FileManager(file_path, fast_line_count=True).get_lines_count()
+            for file_path in [
+                os.path.join(directory, "a.txt"),
+                os.path.join(directory, "b.txt"),
+                os.path.join(directory, "dir", "c.txt"),
+            ]
+        )
+
+        self.assertEqual(35, lines_count)
+
+
+def _get_tests_dir():
+    """
+    get path to /tests directory
+    """
+    return Path(__file__).parent.absolute()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import random
+import tempfile
+import unittest
+
+from code_size_counter.code_size_counter import CodeSizeCounter
+from code_size_counter.histogram import Distribution, Histograms, QuantileSketch
+
+
+class TestQuantileSketch(unittest.TestCase):
+    """
+    class containing tests for QuantileSketch class
+    """
+
+    def test_relative_accuracy(self):
+        """
+        the estimated quantiles are within the relative accuracy of the exact ones
+        """
+        generator = random.Random(42)
+        values = [int(generator.lognormvariate(5, 2)) + 1 for _ in range(10000)]
+        sketch = QuantileSketch(0.01)
+        for value in values:
+            sketch.add(value)
+
+        values.sort()
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            self.assertAlmostEqual(exact, sketch.quantile(q), delta=exact * 0.01)
+        self.assertEqual(values[-1], sketch.max)
+
+    def test_zeros_and_empty_sketch(self):
+        """
+        zeros are counted separately and an empty sketch has no quantiles
+        """
+        sketch = QuantileSketch()
+        self.assertIsNone(sketch.quantile(0.5))
+
+        for value in (0, 0, 0, 5):
+            sketch.add(value)
+        self.assertEqual(0, sketch.quantile(0.5))
+        self.assertAlmostEqual(5, sketch.quantile(1), delta=0.05)
+
+
+class TestDistribution(unittest.TestCase):
+    """
+    class containing tests for Distribution class
+    """
+
+    def test_buckets(self):
+        """
+        the histogram has logarithmic buckets, from the smallest to the largest non-empty one
+        """
+        distribution = Distribution()
+        for value in (0, 9, 10, 99, 1000):
+            distribution.add(value)
+
+        self.assertListEqual(
+            [(0, 0, 1), (1, 9, 1), (10, 99, 2), (100, 999, 0), (1000, 9999, 1)],
+            distribution.get_buckets(),
+        )
+        self.assertListEqual([], Distribution().get_buckets())
+
+
+class TestHistograms(unittest.TestCase):
+    """
+    class containing tests for Histograms class
+    """
+
+    def test_distributions_per_extension(self):
+        """
+        the lines and sizes of the counted files are collected per extension
+        """
+        with tempfile.TemporaryDirectory() as root_dir:
+            files = {
+                "a.py": "x\n",
+                "b.py": "x\n" * 20,
+                "c.py": "x\n" * 300,
+                "readme.md": "",
+            }
+            for path, content in files.items():
+                with open(os.path.join(root_dir, path), "w") as file:
+                    file.write(content)
+
+            histograms = Histograms()
+            CodeSizeCounter(
+                root_dir, ("py", "md"), False, (), listeners=(histograms,)
+            ).calculate_size()
+
+        self.assertListEqual(["md", "py"], sorted(histograms.lines))
+        self.assertListEqual(
+            [(1, 9, 1), (10, 99, 1), (100, 999, 1)],
+            histograms.lines["py"].get_buckets(),
+        )
+        self.assertListEqual(
+            [(1, 9, 1), (10, 99, 1), (100, 999, 1)],
+            histograms.sizes["py"].get_buckets(),
+        )
+        self.assertListEqual([20, 20, 20], histograms.lines["py"].get_quantiles())
+        self.assertEqual(300, histograms.lines["py"].sketch.max)
+        self.assertListEqual([(0, 0, 1)], histograms.sizes["md"].get_buckets())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from code_size_counter.ignore_patterns import IgnorePatternMatcher
+
+
+class TestIgnorePatternMatcher(unittest.TestCase):
+    """
+    class containing tests for IgnorePatternMatcher class
+    """
+
+    def test_match(self):
+        """
+        matching paths against patterns in gitignore syntax
+        """
+        matcher = IgnorePatternMatcher(
+            [
+                "# comment",
+                "node_modules/",
+                "*.min.js",
+                "!keep.min.js",
+                "/build",
+                "docs/*.txt",
+                "a/**/b",
+                "[!x]y.c",
+            ]
+        )
+
+        test_cases = [
+            ("node_modules", True, True),
+            ("src/node_modules", True, True),
+            ("node_modules", False, None),
+            ("app.min.js", False, True),
+            ("src/keep.min.js", False, False),
+            ("build", True, True),
+            ("src/build", True, None),
+            ("docs/a.txt", False, True),
+            ("docs/dir/a.txt", False, None),
+            ("a/b", False, True),
+            ("a/x/y/b", True, True),
+            ("zy.c", False, True),
+            ("xy.c", False, None),
+            ("# comment", False, None),
+        ]
+        for path, is_dir, expected in test_cases:
+            with self.subTest(path=path, is_dir=is_dir):
+                self.assertEqual(expected, matcher.match(path, is_dir))
+
+    def test_no_patterns(self):
+        """
+        matcher without any patterns doesn't match anything
+        """
+        matcher = IgnorePatternMatcher(["", "# comment"])
+
+        self.assertFalse(matcher)
+        self.assertFalse(matcher.is_ignored("main.py", False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from code_size_counter.code_size_counter import CodeSizeCounter
+from code_size_counter.file_tools import FileSetSize
+from code_size_counter.largest_items import LargestItems
+
+
+class TestLargestItems(unittest.TestCase):
+    """
+    class containing tests for LargestItems class
+    """
+
+    def test_largest_files_and_directories(self):
+        """
+        just the given number of the largest items is collected, sorted from the largest one
+        """
+        with tempfile.TemporaryDirectory() as root_dir:
+            os.makedirs(os.path.join(root_dir, "a", "b"))
+            os.mkdir(os.path.join(root_dir, "c"))
+            files = {
+                "main.py": "x\n",
+                os.path.join("a", "a.py"): "x\n" * 3,
+                os.path.join("a", "b", "b.py"): "xxxxxxxxxx\n" * 2,
+                os.path.join("c", "c.py"): "x\n" * 4,
+            }
+            for path, content in files.items():
+                with open(os.path.join(root_dir, path), "w") as file:
+                    file.write(content)
+
+            largest_items = LargestItems(root_dir, 2)
+            CodeSizeCounter(
+                root_dir, ("py",), False, (), listeners=(largest_items,)
+            ).calculate_size()
+
+        self.assertListEqual(
+            [
+                (os.path.join(root_dir, "c", "c.py"), FileSetSize(1, 4, 8)),
+                (os.path.join(root_dir, "a", "a.py"), FileSetSize(1, 3, 6)),
+            ],
+            largest_items.get_files_by_lines(),
+        )
+        self.assertListEqual(
+            [
+                (os.path.join(root_dir, "a", "b", "b.py"), FileSetSize(1, 2, 22)),
+                (os.path.join(root_dir, "c", "c.py"), FileSetSize(1, 4, 8)),
+            ],
+            largest_items.get_files_by_size(),
+        )
+        self.assertListEqual(
+            [("a", FileSetSize(2, 5, 28)), ("c", FileSetSize(1, 4, 8))],
+            largest_items.get_directories_by_lines(),
+        )
+        self.assertListEqual(
+            [
+                ("a", FileSetSize(2, 5, 28)),
+                (os.path.join("a", "b"), FileSetSize(1, 2, 22)),
+            ],
+            largest_items.get_directories_by_size(),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
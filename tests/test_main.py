@@ -0,0 +1,186 @@
+import contextlib
+import io
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from code_size_counter.file_tools import FileRecord, FileSetSize
+from code_size_counter.histogram import Histograms
+from code_size_counter.main import CSV_FORMAT, JSON_FORMAT, config_args, print_results
+
+
+class TestPrintResults(unittest.TestCase):
+    """
+    class containing tests for print_results function
+    """
+
+    file_sizes = {"py": FileSetSize(2, 30, 1000), "md": FileSetSize(1, 5, 100)}
+    other_results = [
+        (
+            "directories",
+            "directory",
+            [(".", FileSetSize(3, 35, 1100)), ("src", FileSetSize(2, 30, 1000))],
+        )
+    ]
+
+    def test_print_json(self):
+        """
+        the results are printed as a single JSON object
+        """
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            print_results(self.file_sizes, None, JSON_FORMAT, self.other_results)
+
+        self.assertDictEqual(
+            {
+                "extensions": {
+                    "md": {"files": 1, "lines": 5, "bytes": 100},
+                    "py": {"files": 2, "lines": 30, "bytes": 1000},
+                },
+                "total": {"files": 3, "lines": 35, "bytes": 1100},
+                "directories": {
+                    ".": {"files": 3, "lines": 35, "bytes": 1100},
+                    "src": {"files": 2, "lines": 30, "bytes": 1000},
+                },
+            },
+            json.loads(output.getvalue()),
+        )
+
+    def test_print_csv(self):
+        """
+        the results are printed as CSV, the results per directory as a second table
+        """
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            print_results(self.file_sizes, None, CSV_FORMAT, self.other_results)
+
+        self.assertEqual(
+            "extension,files,lines,bytes\n"
+            "md,1,5,100\n"
+            "py,2,30,1000\n"
+            "\n"
+            "directory,files,lines,bytes\n"
+            ".,3,35,1100\n"
+            "src,2,30,1000\n",
+            output.getvalue(),
+        )
+
+    def test_print_json_histograms(self):
+        """
+        the histograms are printed under a separate key, with the percentiles and buckets per extension
+        """
+        histograms = Histograms()
+        for lines, size in ((0, 0), (5, 50), (5, 60)):
+            histograms.file_counted(FileRecord("a.py", "py", lines, size))
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            print_results(self.file_sizes, None, JSON_FORMAT, (), histograms)
+
+        self.assertDictEqual(
+            {
+                "py": {
+                    "lines": {
+                        "p50": 5,
+                        "p90": 5,
+                        "p99": 5,
+                        "max": 5,
+                        "buckets": [
+                            {"min": 0, "max": 0, "files": 1},
+                            {"min": 1, "max": 9, "files": 2},
+                        ],
+                    },
+                    "bytes": {
+                        "p50": 50,
+                        "p90": 50,
+                        "p99": 50,
+                        "max": 60,
+                        "buckets": [
+                            {"min": 0, "max": 0, "files": 1},
+                            {"min": 1, "max": 9, "files": 0},
+                            {"min": 10, "max": 99, "files": 2},
+                        ],
+                    },
+                }
+            },
+            json.loads(output.getvalue())["histograms"],
+        )
+
+    def test_prettytable_imported_lazily(self):
+        """
+        PrettyTable isn't imported unless the table is printed
+        """
+        code = (
+            "import sys\n"
+            "from code_size_counter.main import JSON_FORMAT, print_results\n"
+            "print_results({}, None, JSON_FORMAT)\n"
+            "print_results({}, 'lines')\n"
+            "assert 'prettytable' not in sys.modules\n"
+        )
+        subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=_get_tests_dir().parent,
+            check=True,
+            capture_output=True,
+        )
+
+    def test_optional_modules_imported_lazily(self):
+        """
+        modules needed just by some options (cache, worker processes, watch mode, git source, memory-mapped files)
+        aren't imported when the files are counted without them
+        """
+        code = (
+            "import sys\n"
+            "preloaded = set(sys.modules)\n"
+            "from code_size_counter.main import CodeSizeCounter\n"
+            "CodeSizeCounter('tests/simple-test-dir', ('txt',), False, ()).calculate_size()\n"
+            "optional = {'sqlite3', 'hashlib', 'concurrent.futures', 'multiprocessing', 'ctypes',\n"
+            "            'select', 'subprocess', 'mmap'}\n"
+            "imported = (set(sys.modules) - preloaded) & optional\n"
+            "assert not imported, imported\n"
+        )
+        subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=_get_tests_dir().parent,
+            check=True,
+            capture_output=True,
+        )
+
+
+class TestConfigArgs(unittest.TestCase):
+    """
+    class containing tests for config_args function
+    """
+
+    def test_invalid_values(self):
+        """
+        invalid values of the arguments are rejected
+        """
+        for argv, message in [
+            (["--by-directory", "-1"], "DEPTH must be at least 0"),
+            (["--top", "0"], "N must be at least 1"),
+            (["--top", "-3"], "N must be at least 1"),
+        ]:
+            errors = io.StringIO()
+            with mock.patch.object(
+                sys, "argv", ["main.py"] + argv
+            ), contextlib.redirect_stderr(errors), self.assertRaises(SystemExit):
+                config_args()
+            self.assertIn(message, errors.getvalue())
+
+        with mock.patch.object(sys, "argv", ["main.py", "--by-directory", "0"]):
+            self.assertEqual(0, config_args().by_directory)
+
+
+def _get_tests_dir():
+    """
+    get path to /tests directory
+    """
+    return Path(__file__).parent.absolute()
+
+
+if __name__ == "__main__":
+    unittest.main()
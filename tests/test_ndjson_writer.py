@@ -0,0 +1,68 @@
+import io
+import json
+import os
+import unittest
+from pathlib import Path
+
+from code_size_counter.code_size_counter import CodeSizeCounter
+from code_size_counter.file_tools import FileRecord
+from code_size_counter.ndjson_writer import NdjsonWriter
+
+
+class TestNdjsonWriter(unittest.TestCase):
+    """
+    class containing tests for NdjsonWriter class
+    """
+
+    def test_write_counted_files(self):
+        """
+        each counted file is written as a single JSON record
+        """
+        directory = os.path.join(_get_tests_dir(), "simple-test-dir")
+        stream = io.StringIO()
+        CodeSizeCounter(
+            directory, ("txt",), False, (), listeners=(NdjsonWriter(stream),)
+        ).calculate_size()
+
+        records = [json.loads(line) for line in stream.getvalue().splitlines()]
+        self.assertListEqual(
+            [
+                {
+                    "path": os.path.join(directory, "dir", "c.txt"),
+                    "extension": "txt",
+                    "lines": 21,
+                    "bytes": 1004,
+                }
+            ],
+            [record for record in records if record["path"].endswith("c.txt")],
+        )
+        self.assertEqual(3, len(records))
+
+    def test_write_before_finished(self):
+        """
+        the records are written when the buffer is full, without waiting for all files
+        """
+        stream = io.StringIO()
+        writer = NdjsonWriter(stream, buffer_size=100)
+        record = FileRecord(os.path.join("dir", "main.py"), "py", 10, 200)
+
+        writer.file_counted(record)
+        self.assertEqual("", stream.getvalue())
+
+        writer.file_counted(record)
+        self.assertEqual(2, len(stream.getvalue().splitlines()))
+
+        writer.file_counted(record)
+        writer.finished()
+        self.assertEqual(3, len(stream.getvalue().splitlines()))
+
+
+def _get_tests_dir():
+    """
+    get path to /tests directory
+    """
+    return Path(__file__).parent.absolute()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import io
+import os
+import unittest
+from unittest import mock
+
+from code_size_counter import progress
+from code_size_counter.file_tools import FileRecord
+from code_size_counter.progress import FileLog, ProgressReporter
+
+
+class TestFileLog(unittest.TestCase):
+    """
+    class containing tests for FileLog class
+    """
+
+    def test_log_files(self):
+        """
+        the log is buffered until the counting is finished
+        """
+        stream = io.StringIO()
+        file_log = FileLog(stream)
+        file_log.file_counted(FileRecord(os.path.join("dir", "a.py"), "py", 1, 10))
+        file_log.file_skipped(os.path.join("dir", "b.bin"))
+        self.assertEqual("", stream.getvalue())
+
+        file_log.finished()
+        self.assertEqual(
+            "dir/a.py processed\n"
+            "Skipping dir/b.bin , which can't be opened in read mode\n",
+            stream.getvalue(),
+        )
+
+
+class TestProgressReporter(unittest.TestCase):
+    """
+    class containing tests for ProgressReporter class
+    """
+
+    def test_rate_limited_reports(self):
+        """
+        the progress is reported at most once in the refresh interval, the final progress is always reported
+        """
+        stream = _TerminalStream()
+        with mock.patch.object(progress.time, "monotonic", return_value=100.0):
+            reporter = ProgressReporter(stream, refresh_interval=1)
+            for _ in range(1000):
+                reporter.file_counted(
+                    FileRecord(os.path.join("dir", "a.py"), "py", 1, 1024)
+                )
+        self.assertEqual("", stream.getvalue())
+
+        with mock.patch.object(progress.time, "monotonic", return_value=102.0):
+            reporter.file_skipped(os.path.join("dir", "sub", "b.bin"))
+            reporter.finished()
+
+        reports = stream.getvalue().split("\r")[1:]
+        self.assertEqual(2, len(reports))
+        self.assertTrue(
+            reports[-1].startswith(
+                "1001 files (500 files/s), 1.0 MB (0.5 MB/s), dir/sub"
+            )
+        )
+        self.assertTrue(reports[-1].endswith("\n"))
+
+    def test_non_terminal_reports(self):
+        """
+        if the stream isn't a terminal (e.g. CI logs), the reports are separate lines, printed less often
+        """
+        stream = io.StringIO()
+        with mock.patch.object(progress.time, "monotonic", return_value=100.0):
+            reporter = ProgressReporter(stream, refresh_interval=1)
+        for now in (102.0, 111.0):
+            with mock.patch.object(progress.time, "monotonic", return_value=now):
+                reporter.file_counted(
+                    FileRecord(os.path.join("dir", "a.py"), "py", 1, 1024)
+                )
+        with mock.patch.object(progress.time, "monotonic", return_value=112.0):
+            reporter.finished()
+
+        self.assertEqual(
+            "2 files (0 files/s), 0.0 MB (0.0 MB/s), dir\n"
+            "2 files (0 files/s), 0.0 MB (0.0 MB/s), dir\n",
+            stream.getvalue(),
+        )
+
+
+class _TerminalStream(io.StringIO):
+    """
+    text stream pretending to be a terminal
+    """
+
+    def isatty(self):
+        return True
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import ctypes
+import errno
+import os
+import sys
+import tempfile
+import unittest
+
+from code_size_counter.watch import InotifyWatcher
+
+
+@unittest.skipUnless(
+    sys.platform.startswith("linux"), "inotify is available just on Linux"
+)
+class TestInotifyWatcher(unittest.TestCase):
+    """
+    class containing tests for InotifyWatcher class
+    """
+
+    def test_modified_file(self):
+        """
+        modification of a file in a watched directory is reported
+        """
+        with tempfile.TemporaryDirectory() as root_dir, InotifyWatcher() as watcher:
+            watcher.add_directory(root_dir)
+            with open(os.path.join(root_dir, "a.py"), "w"):
+                pass
+            with open(os.path.join(root_dir, "a.py"), "w") as file:
+                file.write("x\n")
+
+            changes = watcher.wait_for_changes()
+
+        self.assertTrue(changes.structure_changed)
+        self.assertSetEqual({os.path.join(root_dir, "a.py")}, changes.modified_files)
+
+    def test_fallback_to_polling(self):
+        """
+        if a directory can't be watched (e.g. the limit of watches was reached), the tree is scanned periodically
+        """
+
+        def add_watch_failing(fd, path, mask):
+            ctypes.set_errno(errno.ENOSPC)
+            return -1
+
+        with tempfile.TemporaryDirectory() as root_dir, InotifyWatcher(
+            poll_interval=0.05
+        ) as watcher:
+            watcher._inotify_add_watch = add_watch_failing
+            watcher.add_directory(root_dir)
+
+            changes = watcher.wait_for_changes()
+
+        self.assertTrue(changes.structure_changed)
+        self.assertSetEqual(set(), changes.modified_files)
+
+
+if __name__ == "__main__":
+    unittest.main()